@@ -5,7 +5,7 @@ from decimal import Decimal
 from sql import Literal, operators
 
 from trytond.i18n import gettext
-from trytond.model import Check, ModelView, Workflow, fields
+from trytond.model import Check, Index, ModelView, Workflow, fields
 from trytond.model.exceptions import AccessError
 from trytond.modules.product import round_price
 from trytond.pool import Pool, PoolMeta
@@ -33,6 +33,16 @@ class Move(metaclass=PoolMeta):
                 Check(t, t.quantity >= t.fifo_quantity),
                 'product_cost_fifo.msg_move_fifo_quantity_greater'),
             ]
+        # Index the moves which still have a FIFO quantity available to
+        # consume in the order they are read
+        cls._sql_indexes.add(
+            Index(
+                t,
+                (t.product, Index.Equality()),
+                (t.effective_date, Index.Range(order='DESC')),
+                (t.id, Index.Range(order='DESC')),
+                where=(t.state == 'done')
+                & ((t.quantity - t.fifo_quantity) > 0)))
 
     @classmethod
     def __register__(cls, module):
@@ -22,7 +22,8 @@ class Template(metaclass=PoolMeta):
 class Product(metaclass=PoolMeta):
     __name__ = 'product.product'
 
-    def _get_available_fifo_moves(self, date=None, offset=0, limit=None):
+    def _get_available_fifo_moves(
+            self, date=None, offset=0, limit=None, before=None):
         pool = Pool()
         Move = pool.get('stock.move')
 
@@ -36,6 +37,15 @@ class Product(metaclass=PoolMeta):
             domain.append(('fifo_quantity_available', '>', 0))
         else:
             domain.append(('effective_date', '<=', date))
+        if before:
+            # Continue after the last move read instead of using an offset
+            domain.append(['OR',
+                    ('effective_date', '<', before.effective_date),
+                    [
+                        ('effective_date', '=', before.effective_date),
+                        ('id', '<', before.id),
+                        ],
+                    ])
         return Move.search(
             domain,
             offset=offset, limit=limit,
@@ -61,15 +71,14 @@ class Product(metaclass=PoolMeta):
         size = config.getint('cache', 'record')
 
         def moves():
-            offset, limit = 0, size
+            before = None
             while True:
                 moves = self._get_available_fifo_moves(
-                    date=date, offset=offset, limit=limit)
+                    date=date, limit=size, before=before)
                 if not moves:
                     break
-                for move in moves:
-                    yield move
-                offset += size
+                yield from moves
+                before = moves[-1]
 
         for move in moves():
             qty = move.fifo_quantity_available if not date else move.quantity
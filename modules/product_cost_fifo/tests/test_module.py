@@ -1,12 +1,79 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 
-from trytond.tests.test_tryton import ModuleTestCase
+import datetime as dt
+from decimal import Decimal
+from unittest.mock import patch
 
+from trytond.modules.company.tests import (
+    CompanyTestMixin, create_company, set_company)
+from trytond.modules.product_cost_fifo import product as product_module
+from trytond.pool import Pool
+from trytond.tests.test_tryton import ModuleTestCase, with_transaction
 
-class ProductCostFIFOTestCase(ModuleTestCase):
+
+class ProductCostFIFOTestCase(CompanyTestMixin, ModuleTestCase):
     'Test ProductCostFIFO module'
     module = 'product_cost_fifo'
 
+    @with_transaction()
+    def test_fifo_move_by_pages(self):
+        "Test FIFO moves are consumed across pages"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        supplier, = Location.search([('code', '=', 'SUP')])
+        storage, = Location.search([('code', '=', 'STO')])
+        customer, = Location.search([('code', '=', 'CUS')])
+        company = create_company()
+        with set_company(company):
+            template, = Template.create([{
+                        'name': 'Test FIFO',
+                        'type': 'goods',
+                        'default_uom': unit.id,
+                        'cost_price_method': 'fifo',
+                        }])
+            product, = Product.create([{
+                        'template': template.id,
+                        }])
+            date = dt.date(2024, 1, 1)
+            in_moves = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': 1,
+                        'from_location': supplier.id,
+                        'to_location': storage.id,
+                        'effective_date': date + dt.timedelta(days=i),
+                        'company': company.id,
+                        'unit_price': Decimal(i + 1),
+                        'currency': company.currency.id,
+                        } for i in range(5)])
+            Move.do(in_moves)
+
+            out_move, = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': 3,
+                        'from_location': storage.id,
+                        'to_location': customer.id,
+                        'effective_date': date + dt.timedelta(days=10),
+                        'company': company.id,
+                        'unit_price': Decimal(10),
+                        'currency': company.currency.id,
+                        }])
+            with patch.object(product_module.config, 'getint') as getint:
+                getint.return_value = 2
+                Move.do([out_move])
+
+            self.assertEqual(out_move.cost_price, Decimal(2))
+            self.assertEqual(
+                [m.fifo_quantity for m in Move.browse(in_moves)],
+                [1, 1, 1, 0, 0])
+
 
 del ModuleTestCase
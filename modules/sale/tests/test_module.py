@@ -1,5 +1,6 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
+import datetime
 from decimal import Decimal
 
 from trytond.modules.account.tests import create_chart
@@ -61,5 +62,83 @@ class SaleTestCase(
                 prices = Product.get_sale_price([product], quantity=1.5)
                 self.assertEqual(prices, {product.id: Decimal('2267.9618')})
 
+    @with_transaction()
+    def test_recompute_cost_price_average_return(self):
+        "Test recompute average cost price with sale return"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Party = pool.get('party.party')
+        Sale = pool.get('sale.sale')
+        SaleLine = pool.get('sale.line')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        supplier, = Location.search([('code', '=', 'SUP')])
+        storage, = Location.search([('code', '=', 'STO')])
+        customer, = Location.search([('code', '=', 'CUS')])
+        party = Party(name="Customer")
+        party.save()
+        company = create_company()
+        with set_company(company):
+            template, = Template.create([{
+                        'name': "Product",
+                        'type': 'goods',
+                        'default_uom': unit.id,
+                        'salable': True,
+                        'sale_uom': unit.id,
+                        'cost_price_method': 'average',
+                        }])
+            product, = Product.create([{
+                        'template': template.id,
+                        }])
+
+            def create_sale(quantity, origin=None):
+                sale = Sale(party=party, origin=origin)
+                sale.lines = [SaleLine(
+                        product=product, quantity=quantity, unit=unit,
+                        unit_price=Decimal(20))]
+                sale.save()
+                return sale
+
+            sale = create_sale(5)
+            sale_return = create_sale(-5, origin=sale)
+
+            date = datetime.date(2024, 1, 1)
+            values = [
+                (10, supplier, storage, Decimal(10), None),
+                (5, storage, customer, Decimal(20), sale.lines[0]),
+                (5, customer, storage, Decimal(20), sale_return.lines[0]),
+                ]
+            moves = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': quantity,
+                        'from_location': from_location.id,
+                        'to_location': to_location.id,
+                        'effective_date': date + datetime.timedelta(days=i),
+                        'company': company.id,
+                        'unit_price': unit_price,
+                        'currency': company.currency.id,
+                        'origin': str(origin) if origin else None,
+                        } for i, (quantity, from_location, to_location,
+                        unit_price, origin) in enumerate(values)])
+            Move.do(moves)
+            cost_price = product.recompute_cost_price_average()
+            self.assertEqual(cost_price, Decimal(10))
+            self.assertEqual(
+                [m.cost_price for m in Move.browse(moves)],
+                [Decimal(10)] * 3)
+
+            Move.write(moves[:1], {'unit_price': Decimal(4)})
+            cost_price = product.recompute_cost_price_average()
+
+            self.assertEqual(cost_price, Decimal(4))
+            self.assertEqual(
+                [m.cost_price for m in Move.browse(moves)],
+                [Decimal(4)] * 3)
+
 
 del ModuleTestCase
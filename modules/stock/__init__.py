@@ -4,8 +4,8 @@
 from trytond.pool import Pool
 
 from . import (
-    configuration, inventory, ir, location, move, party, period, product, res,
-    shipment, stock_reporting_margin)
+    configuration, inventory, ir, ledger, location, move, party, period,
+    product, res, shipment, stock_reporting_margin)
 from .move import StockMixin
 
 __all__ = ['StockMixin', 'register']
@@ -32,6 +32,7 @@ def register():
         party.ContactMechanism,
         period.Period,
         period.Cache,
+        ledger.Ledger,
         product.Template,
         product.Product,
         product.ProductByLocationContext,
@@ -1,6 +1,9 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
+import logging
+import time
 from collections import defaultdict
+from itertools import islice
 
 from sql import Null
 from sql.functions import CharLength
@@ -11,6 +14,7 @@ from trytond.model import (
 from trytond.model.exceptions import AccessError
 from trytond.pool import Pool
 from trytond.pyson import Bool, Eval, If
+from trytond.rpc import RPC
 from trytond.tools import grouped_slice, is_full_text, lstrip_wildcard
 from trytond.transaction import Transaction
 from trytond.wizard import Button, StateTransition, StateView, Wizard
@@ -18,6 +22,8 @@ from trytond.wizard import Button, StateTransition, StateView, Wizard
 from .exceptions import (
     InventoryCountWarning, InventoryFutureWarning, InventoryValidationError)
 
+logger = logging.getLogger(__name__)
+
 
 class Inventory(Workflow, ModelSQL, ModelView):
     'Stock Inventory'
@@ -99,6 +105,9 @@ class Inventory(Workflow, ModelSQL, ModelView):
                     'depends': ['state'],
                     },
                 })
+        cls.__rpc__.update({
+                'add_counts': RPC(readonly=False, instantiate=0),
+                })
 
     @classmethod
     def __register__(cls, module_name):
@@ -204,6 +213,7 @@ class Inventory(Workflow, ModelSQL, ModelView):
                     gettext('stock.msg_inventory_date_in_the_future',
                         inventories=names))
 
+        start = time.monotonic()
         moves = []
         for inventory in inventories:
             keys = set()
@@ -219,9 +229,13 @@ class Inventory(Workflow, ModelSQL, ModelView):
                 if move:
                     moves.append(move)
         if moves:
-            Move.save(moves)
+            for sub_moves in grouped_slice(moves):
+                Move.save(list(sub_moves))
             with transaction.set_context(_skip_warnings=True):
                 Move.do(moves)
+        logger.info(
+            "%d moves of %d inventories done in %.3fs",
+            len(moves), len(inventories), time.monotonic() - start)
 
     @classmethod
     @ModelView.button
@@ -284,7 +298,8 @@ class Inventory(Workflow, ModelSQL, ModelView):
         Product = pool.get('product.product')
 
         grouping = cls.grouping()
-        to_create, to_write = [], []
+        to_create, to_write, to_delete = [], [], []
+        start = time.monotonic()
         for inventory in inventories:
             # Once done computation is wrong because include created moves
             if inventory.state == 'done':
@@ -316,7 +331,7 @@ class Inventory(Workflow, ModelSQL, ModelView):
             # Update existing lines
             for line in inventory.lines:
                 if line.product.type != 'goods':
-                    Line.delete([line])
+                    to_delete.append(line)
                     continue
 
                 key = (inventory.location.id,) + line.unique_key
@@ -343,16 +358,79 @@ class Inventory(Workflow, ModelSQL, ModelView):
                 for i, fname in enumerate(grouping, 1):
                     values[fname] = key[i]
                 to_create.append(values)
-        if to_create:
-            Line.create(to_create)
+        if to_delete:
+            Line.delete(to_delete)
+        for sub_values in grouped_slice(to_create):
+            Line.create(list(sub_values))
         if to_write:
             Line.write(*to_write)
+        logger.info(
+            "%d lines created and %d updated for %d inventories in %.3fs",
+            len(to_create), len(to_write) // 2, len(inventories),
+            time.monotonic() - start)
 
     @classmethod
     @ModelView.button_action('stock.wizard_inventory_count')
     def do_count(cls, inventories):
         cls.complete_lines(inventories)
 
+    @classmethod
+    def add_counts(cls, inventory, counts, size=None):
+        '''
+        Add the counted quantities to the lines of the inventory
+
+        counts is an iterable of key and quantity where the key is a tuple of
+        the grouping values. It is consumed by chunks of size so it can come
+        from a stream like a file or scanner batches.
+        The lines missing are created.
+        '''
+        pool = Pool()
+        Line = pool.get('stock.inventory.line')
+        transaction = Transaction()
+        if inventory.state != 'draft':
+            raise AccessError(
+                gettext('stock.msg_inventory_add_counts_draft',
+                    inventory=inventory.rec_name))
+        if size is None:
+            size = transaction.database.IN_MAX
+
+        grouping = cls.grouping()
+        key2line = {l.unique_key: l for l in Line.search([
+                    ('inventory', '=', inventory.id),
+                    ])}
+        counts = iter(counts)
+        total = 0
+        start = time.monotonic()
+        while True:
+            quantities = defaultdict(float)
+            for key, quantity in islice(counts, size):
+                quantities[tuple(key)] += quantity
+            if not quantities:
+                break
+
+            to_create, to_write = [], []
+            for key, quantity in quantities.items():
+                line = key2line.get(key)
+                if line:
+                    to_write.extend(([line], {
+                                'quantity': (line.quantity or 0) + quantity,
+                                }))
+                else:
+                    values = Line.create_values4complete(inventory, 0)
+                    values.update(zip(grouping, key))
+                    values['quantity'] = quantity
+                    to_create.append(values)
+            if to_write:
+                Line.write(*to_write)
+            if to_create:
+                key2line.update(
+                    (l.unique_key, l) for l in Line.create(to_create))
+
+            total += len(quantities)
+            logger.info(
+                "%s: %d counts added in %.3fs",
+                inventory.rec_name, total, time.monotonic() - start)
+
 
 class InventoryLine(ModelSQL, ModelView):
     'Stock Inventory Line'
@@ -1,6 +1,7 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 
+from collections import defaultdict
 from itertools import groupby
 from operator import attrgetter
 
@@ -53,5 +54,43 @@ class Cron(metaclass=PoolMeta):
 
         records.sort(key=attrgetter('assign_order_key'))
 
-        for kls, records in groupby(records, key=attrgetter('__class__')):
-            kls.assign_try(list(records))
+        # The shipments must be assigned in order to respect their priority
+        # but those sharing no product can be assigned in parallel
+        with Transaction().set_context(queue_batch=False):
+            for shipments in cls._stock_shipment_assign_partition(records):
+                classes = {s.__class__ for s in shipments}
+                if len(classes) == 1:
+                    kls, = classes
+                    kls.__queue__.assign_try_skip_locked(shipments)
+                else:
+                    for kls, sub_shipments in groupby(
+                            shipments, key=attrgetter('__class__')):
+                        kls.assign_try_skip_locked(list(sub_shipments))
+
+    @classmethod
+    def _stock_shipment_assign_partition(cls, shipments):
+        "Return the lists of shipments sharing no product with the others"
+        parents = {}
+
+        def find(product):
+            parents.setdefault(product, product)
+            while parents[product] != product:
+                parents[product] = parents[parents[product]]
+                product = parents[product]
+            return product
+
+        keys = []
+        for shipment in shipments:
+            products = [
+                find(m.product.id) for m in shipment.assign_moves
+                if m.assignation_required]
+            for product in products[1:]:
+                parents[find(product)] = find(products[0])
+            keys.append(products[0] if products else None)
+
+        partitions = defaultdict(list)
+        for shipment, key in zip(shipments, keys):
+            if key is not None:
+                key = find(key)
+            partitions[key].append(shipment)
+        return list(partitions.values())
@@ -0,0 +1,181 @@
+# This file is part of Tryton.  The COPYRIGHT file at the top level of
+# this repository contains the full copyright notices and license terms.
+from collections import defaultdict
+
+from sql import Conflict, Excluded, Literal, Union
+from sql.aggregate import Sum
+from sql.functions import CurrentTimestamp
+
+from trytond.config import config
+from trytond.model import Index, ModelSQL, Unique, fields
+from trytond.pool import Pool
+from trytond.pyson import Eval
+from trytond.tools import grouped_slice, reduce_ids
+from trytond.transaction import Transaction
+
+ENABLED = config.getboolean('stock', 'ledger', default=False)
+
+
+class Ledger(ModelSQL):
+    '''
+    Stock Ledger
+
+    It stores the balance of the done moves per company, location, product and
+    effective date.
+    '''
+    __name__ = 'stock.ledger'
+    company = fields.Many2One(
+        'company.company', "Company",
+        required=True, readonly=True, ondelete='CASCADE')
+    location = fields.Many2One(
+        'stock.location', "Location",
+        required=True, readonly=True, ondelete='CASCADE')
+    product = fields.Many2One(
+        'product.product', "Product",
+        required=True, readonly=True, ondelete='CASCADE',
+        context={
+            'company': Eval('company', -1),
+            },
+        depends={'company'})
+    date = fields.Date("Date", required=True, readonly=True)
+    internal_quantity = fields.Float(
+        "Internal Quantity", required=True, readonly=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        t = cls.__table__()
+        cls._sql_constraints += [
+            ('key_unique',
+                Unique(t, t.company, t.location, t.product, t.date),
+                'stock.msg_ledger_key_unique'),
+            ]
+        cls._sql_indexes.add(
+            Index(
+                t,
+                (t.product, Index.Range()),
+                (t.location, Index.Range()),
+                (t.date, Index.Range()),
+                include=[t.internal_quantity]))
+
+    @classmethod
+    def __register__(cls, module_name):
+        super().__register__(module_name)
+        if cls.enabled():
+            cls.rebuild()
+
+    @classmethod
+    def enabled(cls):
+        "Return if the ledger is maintained and used"
+        return ENABLED
+
+    @classmethod
+    def rebuild(cls):
+        "Rebuild the ledger from the done moves"
+        pool = Pool()
+        Move = pool.get('stock.move')
+        transaction = Transaction()
+        cursor = transaction.connection.cursor()
+        table = cls.__table__()
+        move = Move.__table__()
+
+        keys = [move.company, move.product, move.effective_date.as_('date')]
+        group_by = [move.company, move.product, move.effective_date]
+        done = move.state == 'done'
+        balance = Union(
+            move.select(
+                move.to_location.as_('location'),
+                Sum(move.internal_quantity).as_('quantity'),
+                *keys,
+                where=done,
+                group_by=[move.to_location] + group_by),
+            move.select(
+                move.from_location.as_('location'),
+                (-Sum(move.internal_quantity)).as_('quantity'),
+                *keys,
+                where=done,
+                group_by=[move.from_location] + group_by),
+            all_=True)
+
+        cursor.execute(*table.delete())
+        cursor.execute(*table.insert([
+                    table.company, table.location, table.product,
+                    table.date, table.internal_quantity,
+                    table.create_uid, table.create_date],
+                balance.select(
+                    balance.company, balance.location, balance.product,
+                    balance.date, Sum(balance.quantity),
+                    Literal(transaction.user), CurrentTimestamp(),
+                    group_by=[
+                        balance.company, balance.location, balance.product,
+                        balance.date])))
+
+    @classmethod
+    def add_moves(cls, move_ids, sign=1):
+        "Add the balance of the moves multiplied by sign"
+        pool = Pool()
+        Move = pool.get('stock.move')
+        transaction = Transaction()
+        database = transaction.database
+        cursor = transaction.connection.cursor()
+        table = cls.__table__()
+        move = Move.__table__()
+
+        deltas = defaultdict(float)
+        for sub_ids in grouped_slice(move_ids):
+            cursor.execute(*move.select(
+                    move.company, move.from_location, move.to_location,
+                    move.product, move.effective_date, move.internal_quantity,
+                    where=reduce_ids(move.id, sub_ids)))
+            for (company, from_location, to_location, product, date,
+                    quantity) in cursor:
+                quantity *= sign
+                deltas[(company, to_location, product, date)] += quantity
+                deltas[(company, from_location, product, date)] -= quantity
+
+        # Update in the same order to prevent deadlock
+        keys = sorted(deltas, key=lambda k: (k[:3], str(k[3])))
+        if database.has_insert_on_conflict():
+            columns = [
+                table.company, table.location, table.product, table.date,
+                table.internal_quantity, table.create_uid, table.create_date]
+            for sub_keys in grouped_slice(keys):
+                cursor.execute(*table.insert(
+                        columns,
+                        [[*k, deltas[k], transaction.user, CurrentTimestamp()]
+                            for k in sub_keys],
+                        on_conflict=Conflict(
+                            table,
+                            indexed_columns=[
+                                table.company, table.location, table.product,
+                                table.date],
+                            columns=[
+                                table.internal_quantity,
+                                table.write_uid, table.write_date],
+                            values=[
+                                table.internal_quantity
+                                + Excluded.internal_quantity,
+                                transaction.user, CurrentTimestamp()])))
+        else:
+            for key in keys:
+                company, location, product, date = key
+                where = ((table.company == company)
+                    & (table.location == location)
+                    & (table.product == product)
+                    & (table.date == date))
+                cursor.execute(*table.select(
+                        table.id, where=where, limit=1))
+                if cursor.fetchone():
+                    cursor.execute(*table.update(
+                            [table.internal_quantity,
+                                table.write_uid, table.write_date],
+                            [table.internal_quantity + deltas[key],
+                                transaction.user, CurrentTimestamp()],
+                            where=where))
+                else:
+                    cursor.execute(*table.insert(
+                            [table.company, table.location, table.product,
+                                table.date, table.internal_quantity,
+                                table.create_uid, table.create_date],
+                            [[company, location, product, date, deltas[key],
+                                transaction.user, CurrentTimestamp()]]))
@@ -5,6 +5,8 @@ import operator
 from decimal import Decimal
 
 from sql import Column
+from sql.aggregate import Max, Sum
+from sql.functions import Round
 
 from trytond.cache import Cache
 from trytond.i18n import gettext
@@ -401,16 +403,11 @@ class Location(DeactivableMixin, tree(), ModelSQL, ModelView):
         return grouping, grouping_filter, key
 
     @classmethod
-    def get_quantity(cls, locations, name):
+    def _quantity_context(cls, name):
         pool = Pool()
-        Product = pool.get('product.product')
         Date_ = pool.get('ir.date')
         trans_context = Transaction().context
 
-        def valid_context(name):
-            return (trans_context.get(name) is not None
-                and isinstance(trans_context[name], int))
-
         context = {}
         if (name == 'quantity'
                 and ((trans_context.get('stock_date_end') or datetime.date.max)
@@ -421,7 +418,15 @@ class Location(DeactivableMixin, tree(), ModelSQL, ModelView):
             context['forecast'] = True
             if not trans_context.get('stock_date_end'):
                 context['stock_date_end'] = datetime.date.max
+        return context
 
+    @classmethod
+    def get_quantity(cls, locations, name):
+        pool = Pool()
+        Product = pool.get('product.product')
+        trans_context = Transaction().context
+
+        context = cls._quantity_context(name)
         grouping, grouping_filter, key = cls._get_quantity_grouping()
         if not grouping:
             return {loc.id: None for loc in locations}
@@ -440,7 +445,13 @@ class Location(DeactivableMixin, tree(), ModelSQL, ModelView):
 
     @classmethod
     def search_quantity(cls, name, domain):
+        pool = Pool()
+        Move = pool.get('stock.move')
+        Uom = pool.get('product.uom')
+        uom = Uom.__table__()
+        transaction = Transaction()
         _, operator_, operand = domain
+        Operator = fields.SQL_OPERATORS[operator_]
         operator_ = {
             '=': operator.eq,
             '>=': operator.ge,
@@ -452,11 +463,40 @@ class Location(DeactivableMixin, tree(), ModelSQL, ModelView):
             'not in': lambda v, l: v not in l,
             }.get(operator_, lambda v, l: False)
 
-        ids = []
-        for location in cls.search([]):
-            if operator_(getattr(location, name), operand):
-                ids.append(location.id)
-        return [('id', 'in', ids)]
+        grouping, grouping_filter, _ = cls._get_quantity_grouping()
+        if not grouping:
+            ids = []
+            for location in cls.search([]):
+                if operator_(getattr(location, name), operand):
+                    ids.append(location.id)
+            return [('id', 'in', ids)]
+
+        location_ids = [l.id for l in cls.search([], order=[])]
+        with_childs = transaction.context.get('with_childs', True)
+        with transaction.set_context(cls._quantity_context(name)):
+            query = Move.compute_quantities_query(
+                location_ids, with_childs,
+                grouping=grouping, grouping_filter=grouping_filter)
+        if not query:
+            return [('id', 'in', [])]
+        location, from_ = Move._quantity_location_query(
+            query, location_ids, with_childs)
+        # Use the biggest digits of all unit as best approximation of the
+        # rounding done by products_by_location
+        quantity = Round(
+            fields.Numeric('quantity').sql_cast(Sum(query.quantity)),
+            uom.select(Max(uom.digits)))
+        domain = [('id', 'in', from_.select(
+                    location,
+                    group_by=[location],
+                    having=Operator(quantity, operand)))]
+        # Locations without move have a quantity of 0
+        if operand is not None and operator_(0, operand):
+            domain = ['OR',
+                domain,
+                ('id', 'not in', from_.select(location)),
+                ]
+        return domain
 
     @classmethod
     def get_quantity_uom(cls, locations, name):
@@ -129,11 +129,7 @@ class StockMixin(object):
         _, operator_, operand = domain
 
         with Transaction().set_context(cls._quantity_context(name)):
-            if (len(location_ids) == 1
-                    and not Transaction().context.get('stock_skip_warehouse')):
-                # We can use the compute quantities query if the request is for
-                # a single location because all the locations are children and
-                # so we can do a SUM.
+            if not Transaction().context.get('stock_skip_warehouse'):
                 Operator = fields.SQL_OPERATORS[operator_]
                 query = Move.compute_quantities_query(
                     location_ids, with_childs, grouping=grouping)
@@ -145,9 +141,19 @@ class StockMixin(object):
                     fields.Numeric('quantity').sql_cast(Sum(query.quantity)),
                     uom.select(Max(uom.digits)))
                 group_by = [Column(query, key).as_(key) for key in grouping]
-                return [('id', 'in', query.select(
+                if len(location_ids) == 1:
+                    # All the locations are children so we can do a SUM.
+                    return [('id', 'in', query.select(
+                                col_id,
+                                group_by=group_by,
+                                having=Operator(quantity, operand)))]
+                # The record is valid if the quantity of any location is
+                # valid so the quantities are summed per location.
+                location, from_ = Move._quantity_location_query(
+                    query, location_ids, with_childs)
+                return [('id', 'in', from_.select(
                             col_id,
-                            group_by=group_by,
+                            group_by=[location] + group_by,
                             having=Operator(quantity, operand)))]
 
             pbl = Product.products_by_location(
@@ -370,6 +376,9 @@ class Move(Workflow, ModelSQL, ModelView):
             | set(['planned_date', 'effective_date']))
         cls._allow_modify_closed_period = {
             'cost_price', 'unit_price', 'unit_price_updated', 'currency'}
+        cls._ledger_fields = {
+            'state', 'product', 'unit', 'quantity', 'internal_quantity',
+            'from_location', 'to_location', 'effective_date', 'company'}
 
         t = cls.__table__()
         cls._sql_constraints += [
@@ -942,6 +951,7 @@ class Move(Workflow, ModelSQL, ModelView):
         pool = Pool()
         Product = pool.get('product.product')
         Uom = pool.get('product.uom')
+        Ledger = pool.get('stock.ledger')
 
         vlist = [x.copy() for x in vlist]
         # Use ordered dict to optimize cache alignment
@@ -963,10 +973,26 @@ class Move(Workflow, ModelSQL, ModelView):
             vals['internal_quantity'] = internal_quantity
         moves = super(Move, cls).create(vlist)
         cls.check_period_closed(moves)
+        if Ledger.enabled():
+            Ledger.add_moves([
+                    m.id for m, v in zip(moves, vlist)
+                    if v.get('state') == 'done'])
         return moves
 
     @classmethod
     def write(cls, *args):
+        pool = Pool()
+        Ledger = pool.get('stock.ledger')
+
+        to_check = set()
+        if Ledger.enabled():
+            actions = iter(args)
+            for moves, values in zip(actions, actions):
+                if cls._ledger_fields & set(values):
+                    to_check.update(m.id for m in moves)
+            # Remove the balance of the done moves before their modification
+            Ledger.add_moves(cls._done_ids(to_check), sign=-1)
+
         actions = iter(args)
         for moves, values in zip(actions, actions):
             vals_set = set(values)
@@ -985,6 +1011,11 @@ class Move(Workflow, ModelSQL, ModelView):
 
         super(Move, cls).write(*args)
 
+        # Add the balance before the following writes which update the ledger
+        # by themselves
+        if to_check:
+            Ledger.add_moves(cls._done_ids(to_check))
+
         to_write = []
         unit_price_update = []
         actions = iter(args)
@@ -1010,6 +1041,19 @@ class Move(Workflow, ModelSQL, ModelView):
         if unit_price_update:
             cls.write(unit_price_update, {'unit_price_updated': True})
 
+    @classmethod
+    def _done_ids(cls, ids):
+        "Return the ids of the done moves"
+        cursor = Transaction().connection.cursor()
+        table = cls.__table__()
+        done = set()
+        for sub_ids in grouped_slice(ids):
+            cursor.execute(*table.select(table.id,
+                    where=reduce_ids(table.id, sub_ids)
+                    & (table.state == 'done')))
+            done.update(i for i, in cursor)
+        return done
+
     @classmethod
     def delete(cls, moves):
         for move in moves:
@@ -1313,6 +1357,17 @@ class Move(Workflow, ModelSQL, ModelView):
         else:
             cls.lock()
 
+    @classmethod
+    def _quantities_use_ledger(cls, grouping):
+        "Return if the stock ledger can be used to compute the quantities"
+        pool = Pool()
+        Ledger = pool.get('stock.ledger')
+        context = Transaction().context
+        return (Ledger.enabled()
+            and 'product' in grouping
+            and set(grouping) <= {'product', 'date'}
+            and not context.get('stock_destinations'))
+
     @classmethod
     def compute_quantities_query(cls, location_ids, with_childs=False,
             grouping=('product',), grouping_filter=None):
@@ -1350,6 +1405,7 @@ class Move(Workflow, ModelSQL, ModelView):
         Period = pool.get('stock.period')
         Move = pool.get('stock.move')
         Product = pool.get('product.product')
+        Ledger = pool.get('stock.ledger')
 
         move = Move.__table__()
         today = Date.today()
@@ -1584,6 +1640,39 @@ class Move(Workflow, ModelSQL, ModelView):
                 state_date_clause_in &= state_date_clause()
                 state_date_clause_out &= state_date_clause()
 
+        use_ledger = cls._quantities_use_ledger(grouping)
+        if use_ledger:
+            # The done moves are summed by the ledger
+            state_date_clause_in &= move.state != 'done'
+            state_date_clause_out &= move.state != 'done'
+            ledger = Ledger.__table__()
+            if with_childs:
+                location = Location.__table__()
+                parent_location = Location.__table__()
+                columns = ['internal_quantity', 'company', 'product', 'date']
+                columns = [Column(ledger, c).as_(c) for c in columns]
+                ledger = Union(
+                    ledger.select(ledger.location.as_('location'), *columns),
+                    ledger.join(location,
+                        condition=ledger.location == location.id
+                        ).join(parent_location, type_='LEFT',
+                        condition=location.parent == parent_location.id
+                        ).select(
+                        parent_location.id.as_('location'),
+                        *columns,
+                        where=parent_location.flat_childs == Literal(True)),
+                    all_=True)
+            where_ledger = ledger.date <= context['stock_date_end']
+            if context.get('stock_date_start'):
+                where_ledger &= ledger.date >= context['stock_date_start']
+            elif period:
+                where_ledger &= ledger.date > period.date
+            if grouping_filter:
+                for fieldname, grouping_ids in zip(grouping, grouping_filter):
+                    if grouping_ids:
+                        where_ledger &= Column(ledger, fieldname).in_(
+                            grouping_ids)
+
         if with_childs:
             location_query = _location_children(location_ids, query=True)
         else:
@@ -1664,6 +1753,19 @@ class Move(Workflow, ModelSQL, ModelView):
                     & period_cache.location.in_(location_query)
                     & dest_clause_period),
                 all_=True)
+        if use_ledger:
+            if company:
+                company_clause = ledger.company == company.id
+            ledger_keys = [Column(ledger, key) for key in grouping]
+            query = Union(query, ledger.select(
+                    ledger.location.as_('location'),
+                    Sum(ledger.internal_quantity).as_('quantity'),
+                    *(Column(ledger, key).as_(key) for key in grouping),
+                    where=where_ledger
+                    & ledger.location.in_(location_query)
+                    & company_clause,
+                    group_by=[ledger.location] + ledger_keys),
+                all_=True)
         query_keys = [Column(query, key).as_(key) for key in grouping]
         quantity = Sum(query.quantity)
         if context.get('stock_invert'):
@@ -1675,6 +1777,29 @@ class Move(Workflow, ModelSQL, ModelView):
             group_by=[query.location] + query_keys)
         return query
 
+    @classmethod
+    def _quantity_location_query(cls, query, location_ids, with_childs):
+        """
+        Return the column of the location and the from item to aggregate the
+        compute quantities query per location of location_ids.
+
+        If with_childs, the quantities of the child locations are aggregated
+        to their parent.
+        """
+        pool = Pool()
+        Location = pool.get('stock.location')
+        if not with_childs:
+            return query.location, query
+        location = Location.__table__()
+        parent = Location.__table__()
+        from_ = query.join(
+            location, condition=query.location == location.id
+            ).join(parent,
+                condition=(location.left >= parent.left)
+                & (location.right <= parent.right)
+                & reduce_ids(parent.id, location_ids))
+        return parent.id, from_
+
     @classmethod
     def compute_quantities(cls, query, location_ids, with_childs=False,
             grouping=('product',), grouping_filter=None):
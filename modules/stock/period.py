@@ -1,8 +1,10 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
+import datetime
 from itertools import chain, groupby
 
-from sql import For, Literal
+from sql import Column, For, Literal
+from sql.functions import CurrentTimestamp
 
 from trytond.i18n import gettext
 from trytond.model import Index, ModelSQL, ModelView, Workflow, fields
@@ -116,17 +118,16 @@ class Period(Workflow, ModelSQL, ModelView):
             with connection.cursor() as cursor:
                 cursor.execute(*query)
 
-        locations = Location.search([
-                ('type', 'not in', ['warehouse', 'view']),
-                ], order=[])
-
+        periods = sorted(periods, key=lambda p: (p.company.id, p.date))
+        recent_date = max(p.date for p in periods)
         for company, c_periods in groupby(periods, key=lambda p: p.company):
+            c_periods = list(c_periods)
             with Transaction().set_context(company=company.id):
                 today = Date.today()
-            recent_date = max(period.date for period in c_periods)
-            if recent_date >= today:
+            if c_periods[-1].date >= today:
                 raise PeriodCloseError(
                     gettext('stock.msg_period_close_date'))
+
         if Move.search([
                     ('state', '=', 'assigned'),
                     ['OR', [
@@ -138,30 +139,74 @@ class Period(Workflow, ModelSQL, ModelView):
             raise PeriodCloseError(
                 gettext('stock.msg_period_close_assigned_move'))
 
+        locations = Location.search([
+                ('type', 'not in', ['warehouse', 'view']),
+                ], order=[])
+        location_ids = [l.id for l in locations]
+
         for grouping in cls.groupings():
             Cache = cls.get_cache(grouping)
             to_create = []
-            for period in periods:
-                with Transaction().set_context(
-                        stock_date_end=period.date,
-                        stock_date_start=None,
-                        stock_assign=False,
-                        forecast=False,
-                        stock_destinations=None,
-                        ):
-                    pbl = Product.products_by_location(
-                        [l.id for l in locations], grouping=grouping)
-                for key, quantity in pbl.items():
-                    values = {
-                        'location': key[0],
-                        'period': period.id,
-                        'internal_quantity': quantity,
+            for company, c_periods in groupby(
+                    periods, key=lambda p: p.company):
+                quantities, previous = None, None
+                for period in c_periods:
+                    context = {
+                        'company': company.id,
+                        'stock_date_end': period.date,
+                        'stock_date_start': None,
+                        'stock_assign': False,
+                        'forecast': False,
+                        'stock_destinations': None,
                         }
-                    for i, field in enumerate(grouping, 1):
-                        values[field] = key[i]
-                    to_create.append(values)
-            if to_create:
-                Cache.create(to_create)
+                    if quantities is None:
+                        with Transaction().set_context(context):
+                            quantities = Product.products_by_location(
+                                location_ids, grouping=grouping)
+                    else:
+                        # Add the moves since the previous period
+                        context['stock_date_start'] = (
+                            previous.date + datetime.timedelta(days=1))
+                        with Transaction().set_context(context):
+                            delta = Product.products_by_location(
+                                location_ids, grouping=grouping)
+                        quantities = quantities.copy()
+                        for key, quantity in delta.items():
+                            quantities[key] = (
+                                quantities.get(key, 0) + quantity)
+                    for key, quantity in quantities.items():
+                        values = {
+                            'location': key[0],
+                            'period': period.id,
+                            'internal_quantity': quantity,
+                            }
+                        for i, field in enumerate(grouping, 1):
+                            values[field] = key[i]
+                        to_create.append(values)
+                    previous = period
+            cls._insert_caches(Cache, to_create)
+
+    @classmethod
+    def _insert_caches(cls, Cache, vlist):
+        "Insert the cache values in bulk"
+        transaction = Transaction()
+        database = transaction.database
+        cursor = transaction.connection.cursor()
+        table = Cache.__table__()
+        if not vlist:
+            return
+        names = sorted(vlist[0].keys())
+        columns = [Column(table, n) for n in names]
+        columns += [table.create_uid, table.create_date]
+        if database.has_multirow_insert():
+            count = database.IN_MAX
+        else:
+            count = 1
+        for sub_vlist in grouped_slice(vlist, count):
+            cursor.execute(*table.insert(columns, [
+                        [v[n] for n in names]
+                        + [transaction.user, CurrentTimestamp()]
+                        for v in sub_vlist]))
 
 
 class Cache(ModelSQL, ModelView):
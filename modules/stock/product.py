@@ -8,7 +8,7 @@ from decimal import Decimal
 
 from simpleeval import InvalidExpression, simple_eval
 from sql import Literal, Null, Select, Window, With
-from sql.aggregate import Max, Sum
+from sql.aggregate import Max, Min, Sum
 from sql.conditionals import Case, Coalesce
 from sql.functions import CurrentTimestamp
 from sql.operators import Concat
@@ -323,16 +323,23 @@ class Product(StockMixin, object, metaclass=PoolMeta):
     def recompute_cost_price_from_moves(cls):
         pool = Pool()
         Move = pool.get('stock.move')
-        products = set()
-        for move in Move.search([
-                    ('unit_price_updated', '=', True),
-                    cls._domain_moves_cost(),
-                    ],
-                order=[('effective_date', 'ASC')]):
-            if move.product not in products:
-                cls.__queue__.recompute_cost_price(
-                    [move.product], start=move.effective_date)
-                products.add(move.product)
+        move = Move.__table__()
+        cursor = Transaction().connection.cursor()
+
+        # Each product is recomputed in its own task so they can be processed
+        # in parallel by the workers
+        cursor.execute(*move.select(
+                move.product, Min(move.effective_date),
+                where=move.id.in_(Move.search([
+                            ('unit_price_updated', '=', True),
+                            cls._domain_moves_cost(),
+                            ], order=[], query=True)),
+                group_by=[move.product],
+                order_by=[Min(move.effective_date).asc]))
+        for product_id, start in cursor:
+            if isinstance(start, str):
+                start = datetime.date.fromisoformat(start)
+            cls.__queue__.recompute_cost_price([cls(product_id)], start=start)
 
     @classmethod
     def recompute_cost_price(cls, products, start=None):
@@ -452,19 +459,7 @@ class Product(StockMixin, object, metaclass=PoolMeta):
         cost_price = Decimal(0)
         quantity = 0
         if start:
-            domain.remove(('effective_date', '>=', start))
-            domain.append(('effective_date', '<', start))
-            domain.append(self._domain_in_moves_cost())
-            prev_moves = Move.search(
-                domain,
-                order=[('effective_date', 'DESC'), ('id', 'DESC')],
-                limit=1)
-            if prev_moves:
-                move, = prev_moves
-                cost_price = move.cost_price
-                quantity = self._get_storage_quantity(
-                    date=start - datetime.timedelta(days=1))
-                quantity = Decimal(str(quantity))
+            cost_price, quantity = self._get_cost_price_before(start)
 
         def in_move(move):
             return move.id in _in_moves
@@ -477,6 +472,13 @@ class Product(StockMixin, object, metaclass=PoolMeta):
                 move.from_location.type == 'production'
                 or move.to_location.type == 'production')
 
+        def write_cost_price(moves, cost_price):
+            # The cost prices must be written at each date because the cost
+            # price of some moves may depend on the one of previous moves
+            Move.write([
+                    m for m in moves if m.cost_price != cost_price],
+                dict(cost_price=cost_price))
+
         current_moves = []
         current_cost_price = cost_price
         qty_production = 0
@@ -484,10 +486,7 @@ class Product(StockMixin, object, metaclass=PoolMeta):
             if (current_moves
                     and current_moves[-1].effective_date
                     != move.effective_date):
-                Move.write([
-                        m for m in current_moves
-                        if m.cost_price != current_cost_price],
-                    dict(cost_price=current_cost_price))
+                write_cost_price(current_moves, current_cost_price)
                 current_moves.clear()
                 qty_production = 0
             current_moves.append(move)
@@ -515,15 +514,31 @@ class Product(StockMixin, object, metaclass=PoolMeta):
             if production_move(move):
                 qty_production += qty
 
-        Move.write([
-                m for m in current_moves
-                if m.cost_price != current_cost_price],
-            dict(cost_price=current_cost_price))
+        write_cost_price(current_moves, current_cost_price)
 
         for revision in revisions:
             cost_price = revision.get_cost_price(cost_price)
         return cost_price
 
+    def _get_cost_price_before(self, start):
+        "Return the cost price and the quantity of the product before start"
+        pool = Pool()
+        Move = pool.get('stock.move')
+        moves = Move.search([
+                ('product', '=', self.id),
+                self._domain_moves_cost(),
+                self._domain_in_moves_cost(),
+                ('effective_date', '<', start),
+                ],
+            order=[('effective_date', 'DESC'), ('id', 'DESC')],
+            limit=1)
+        if not moves:
+            return Decimal(0), 0
+        move, = moves
+        quantity = self._get_storage_quantity(
+            date=start - datetime.timedelta(days=1))
+        return move.cost_price, Decimal(str(quantity))
+
     @classmethod
     def view_attributes(cls):
         return super().view_attributes() + [
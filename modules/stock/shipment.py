@@ -1,15 +1,19 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 import datetime
+import logging
+import time
 from collections import defaultdict
 from functools import partial
 from itertools import groupby
 
-from sql import Null
+from sql import Literal, Null, Select
+from sql.aggregate import Sum
 from sql.conditionals import Coalesce
 from sql.functions import CharLength
 
 from trytond.i18n import gettext, lazy_gettext
+from trytond.ir.cron import str2bigint
 from trytond.model import (
     Index, ModelSQL, ModelView, Workflow, dualmethod, fields, sort)
 from trytond.model.exceptions import AccessError
@@ -17,11 +21,15 @@ from trytond.modules.company import CompanyReport
 from trytond.modules.company.model import employee_field, set_employee
 from trytond.pool import Pool
 from trytond.pyson import Bool, Eval, Id, If, TimeDelta
+from trytond.rpc import RPC
+from trytond.tools import grouped_slice, reduce_ids
 from trytond.transaction import Transaction
 from trytond.wizard import Button, StateTransition, StateView, Wizard
 
 from .exceptions import ShipmentCheckQuantityWarning
 
+logger = logging.getLogger(__name__)
+
 
 class ShipmentMixin:
     __slots__ = ()
@@ -171,6 +179,74 @@ class ShipmentAssignMixin(ShipmentMixin):
     def assign_try(cls, shipments):
         raise NotImplementedError
 
+    @classmethod
+    def assign_try_skip_locked(cls, shipments):
+        "Try to assign the shipments not locked by another transaction"
+        start = time.monotonic()
+        shipments = cls._assign_try_skip_locked(shipments)
+        if not shipments:
+            return
+        cls.assign_try(shipments)
+        shipments = cls.browse(shipments)
+        count = sum(
+            1 for s in shipments for m in s.assign_moves
+            if m.assignation_required and m.state == 'assigned')
+        duration = time.monotonic() - start
+        logger.info(
+            "%s: %d moves of %d shipments assigned in %.3fs (%.1f moves/s)",
+            cls.__name__, count, len(shipments), duration,
+            count / duration if duration else count)
+
+    @classmethod
+    def _assign_try_skip_locked(cls, shipments):
+        """Return the shipments that are not locked by another transaction
+
+        The shipments and the products of their moves to assign are locked
+        until the end of the transaction.
+        The shipments are expected in priority order.
+        """
+        transaction = Transaction()
+        database = transaction.database
+        if not database.has_select_for():
+            return shipments
+        cursor = transaction.connection.cursor()
+        table = cls.__table__()
+        For = database.get_select_for_skip_locked()
+
+        locked = set()
+        for sub_shipments in grouped_slice(shipments):
+            cursor.execute(*table.select(table.id,
+                    where=reduce_ids(table.id, [s.id for s in sub_shipments])
+                    & (table.state == 'waiting'),
+                    for_=For('UPDATE')))
+            locked.update(i for i, in cursor)
+
+        products = {}
+
+        def lock_product(product_id):
+            if product_id not in products:
+                cursor.execute(*Select([database.lock_id(
+                                str2bigint(f'stock.move,assign,{product_id}'))
+                            ]))
+                products[product_id], = cursor.fetchone()
+            return products[product_id]
+
+        to_assign = []
+        # Products of skipped shipments are not assigned to the next shipments
+        # to respect the priority order
+        skipped = set()
+        for shipment in shipments:
+            product_ids = sorted({
+                    m.product.id for m in shipment.assign_moves
+                    if m.assignation_required})
+            if (shipment.id in locked
+                    and skipped.isdisjoint(product_ids)
+                    and all(lock_product(p) for p in product_ids)):
+                to_assign.append(shipment)
+            else:
+                skipped.update(product_ids)
+        return cls.browse(to_assign)
+
     @dualmethod
     def assign_reset(cls, shipments):
         cls.wait(shipments)
@@ -1371,6 +1447,14 @@ class ShipmentOut(
                 'assign_try': {},
                 'assign_force': {},
                 })
+        cls.__rpc__.update({
+                'process_wave': RPC(
+                    readonly=False, instantiate=0,
+                    result=lambda r: list(map(int, r))),
+                'get_pick_route': RPC(
+                    instantiate=0,
+                    result=lambda r: [(l.id, p.id, q) for l, p, q in r]),
+                })
 
     @classmethod
     def __register__(cls, module_name):
@@ -1600,6 +1684,100 @@ class ShipmentOut(
         Move.delete(to_delete)
         Move.assign(outgoing_moves)
 
+    @classmethod
+    def process_wave(cls, shipments, pack=False):
+        """
+        Assign, pick and, if pack is set, pack the shipments together
+
+        Each step is done once for all the shipments of the wave so the
+        products and locations are loaded only once.
+        Return the shipments that could not reach the last step.
+        """
+        start = time.monotonic()
+        shipments = cls.browse(shipments)
+        cls.assign_try([s for s in shipments if s.state == 'waiting'])
+
+        shipments = cls.browse(shipments)
+        to_pick = [s for s in shipments if s.state == 'assigned']
+        if to_pick:
+            cls.pick(to_pick)
+        states = {'picked', 'packed', 'done'}
+        if pack:
+            shipments = cls.browse(shipments)
+            to_pack = [s for s in shipments if s.state == 'picked']
+            if to_pack:
+                cls.pack(to_pack)
+            states.remove('picked')
+
+        shipments = cls.browse(shipments)
+        remaining = [s for s in shipments if s.state not in states]
+        logger.info(
+            "%s: wave of %d shipments processed in %.3fs, %d remaining",
+            cls.__name__, len(shipments), time.monotonic() - start,
+            len(remaining))
+        return remaining
+
+    @classmethod
+    def get_pick_route(cls, shipments):
+        """
+        Return the list of location, product and quantity to pick for the
+        assigned shipments.
+
+        The quantities of all the shipments are summed per location and
+        product in the default unit of the product and they are ordered
+        following the location tree.
+        """
+        pool = Pool()
+        Move = pool.get('stock.move')
+        Location = pool.get('stock.location')
+        Product = pool.get('product.product')
+        move = Move.__table__()
+        location = Location.__table__()
+        cursor = Transaction().connection.cursor()
+
+        # The moves to assign are the inventory moves to the output location
+        # or all the moves when the output is the storage location
+        outputs = defaultdict(list)
+        for shipment in shipments:
+            if shipment.state != 'assigned':
+                continue
+            if shipment.warehouse_storage != shipment.warehouse_output:
+                output = shipment.warehouse_output.id
+            else:
+                output = None
+            outputs[output].append(str(shipment))
+        if not outputs:
+            return []
+        where = Literal(False)
+        for output, references in outputs.items():
+            for sub_references in grouped_slice(references):
+                condition = move.shipment.in_(list(sub_references))
+                if output is not None:
+                    condition &= move.to_location == output
+                where |= condition
+
+        cursor.execute(*move.join(location,
+                condition=move.from_location == location.id
+                ).select(
+                move.from_location, move.product, Sum(move.internal_quantity),
+                where=where & (move.state == 'assigned'),
+                group_by=[location.left, move.from_location, move.product],
+                order_by=[
+                    location.left.asc, move.from_location.asc,
+                    move.product.asc]))
+        rows = cursor.fetchall()
+        locations = {
+            l.id: l for l in Location.browse(list({r[0] for r in rows}))}
+        products = {
+            p.id: p for p in Product.browse(list({r[1] for r in rows}))}
+        route = []
+        for location_id, product_id, quantity in rows:
+            product = products[product_id]
+            route.append((
+                    locations[location_id], product,
+                    product.default_uom.round(quantity)))
+        return route
+
     @property
     def _check_quantity_source_moves(self):
         return self.inventory_moves
@@ -5,12 +5,14 @@ import datetime
 from collections import defaultdict
 from decimal import Decimal
 from functools import partial
+from unittest.mock import patch
 
 from dateutil.relativedelta import relativedelta
 
 from trytond.model.exceptions import AccessError
 from trytond.modules.company.tests import (
     CompanyTestMixin, PartyCompanyCheckEraseMixin, create_company, set_company)
+from trytond.modules.stock import ledger
 from trytond.modules.stock.exceptions import (
     LocationValidationError, MoveOriginWarning, PeriodCloseError,
     ProductStockWarning)
@@ -366,6 +368,123 @@ class StockTestCase(
                 Period.close([period])
                 test_products_by_location()
 
+    def test_products_by_location_ledger(self):
+        "Test products_by_location with ledger"
+        with patch.object(ledger, 'ENABLED', True):
+            self.test_products_by_location()
+
+    @with_transaction()
+    def test_ledger(self):
+        "Test ledger"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Ledger = pool.get('stock.ledger')
+        Date = pool.get('ir.date')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template, = Template.create([{
+                    'name': "Product",
+                    'type': 'goods',
+                    'default_uom': unit.id,
+                    }])
+        product, = Product.create([{
+                    'template': template.id,
+                    }])
+        lost_found, = Location.search([('type', '=', 'lost_found')])
+        storage, = Location.search([('code', '=', 'STO')])
+        company = create_company()
+        with set_company(company), patch.object(ledger, 'ENABLED', True):
+            today = Date.today()
+
+            moves = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': quantity,
+                        'from_location': lost_found.id,
+                        'to_location': storage.id,
+                        'effective_date': today,
+                        'company': company.id,
+                        } for quantity in [1, 2]])
+            Move.do(moves)
+
+            balances = Ledger.search([], order=[('internal_quantity', 'ASC')])
+            self.assertEqual(
+                [(l.location, l.product, l.date, l.internal_quantity)
+                    for l in balances],
+                [(lost_found, product, today, -3),
+                    (storage, product, today, 3)])
+
+            Move.cancel(moves[:1])
+            with Transaction().set_context(locations=[storage.id]):
+                self.assertEqual(Product(product.id).quantity, 2)
+
+            Ledger.rebuild()
+            with Transaction().set_context(locations=[storage.id]):
+                self.assertEqual(Product(product.id).quantity, 2)
+
+    @with_transaction()
+    def test_ledger_write_done(self):
+        "Test ledger with modification of done moves"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Ledger = pool.get('stock.ledger')
+        Date = pool.get('ir.date')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        dozen = Uom(
+            name="Dozen", symbol="dz", category=unit.category,
+            factor=12, rate=round(1 / 12, 12), rounding=1, digits=0)
+        dozen.save()
+        template, = Template.create([{
+                    'name': "Product",
+                    'type': 'goods',
+                    'default_uom': unit.id,
+                    }])
+        product, = Product.create([{
+                    'template': template.id,
+                    }])
+        lost_found, = Location.search([('type', '=', 'lost_found')])
+        storage, = Location.search([('code', '=', 'STO')])
+        company = create_company()
+        with set_company(company), patch.object(ledger, 'ENABLED', True):
+            today = Date.today()
+
+            def balances():
+                return sorted(
+                    (l.location.id, l.product.id, l.date, l.internal_quantity)
+                    for l in Ledger.search([]) if l.internal_quantity)
+
+            move, = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': 2,
+                        'from_location': lost_found.id,
+                        'to_location': storage.id,
+                        'effective_date': today,
+                        'company': company.id,
+                        }])
+            Move.do([move])
+
+            Move.write([move], {'unit': dozen.id})
+            self.assertEqual(balances(), sorted([
+                        (lost_found.id, product.id, today, -24),
+                        (storage.id, product.id, today, 24),
+                        ]))
+            with Transaction().set_context(locations=[storage.id]):
+                self.assertEqual(Product(product.id).quantity, 24)
+
+            result = balances()
+            Ledger.rebuild()
+            self.assertEqual(balances(), result)
+
     @with_transaction()
     def test_products_by_location_with_childs(self):
         'Test products_by_location with_childs and stock_skip_warehouse'
@@ -450,6 +569,30 @@ class StockTestCase(
                         ])
                 self.assertListEqual([product], found_products)
 
+            with Transaction().set_context(
+                    locations=[warehouse.id, storage.id], with_childs=True):
+                for quantity, result in [
+                        (1, [product]), (2, [product]), (3, [])]:
+                    found_products = Product.search([
+                            ('quantity', '=', quantity),
+                            ])
+                    self.assertListEqual(found_products, result, msg=quantity)
+
+            with Transaction().set_context(product=product.id):
+                for quantity, result in [
+                        (2, [storage]), (1, [warehouse]), (-1, [input_])]:
+                    found_locations = Location.search([
+                            ('quantity', '=', quantity),
+                            ('type', '!=', 'lost_found'),
+                            ])
+                    self.assertListEqual(
+                        found_locations, result, msg=quantity)
+                found_locations = Location.search([
+                        ('quantity', '=', 0),
+                        ])
+                self.assertIn(storage1, found_locations)
+                self.assertNotIn(storage, found_locations)
+
             with Transaction().set_context(stock_skip_warehouse=True):
                 products_by_location = Product.products_by_location(
                     [warehouse.id],
@@ -580,6 +723,11 @@ class StockTestCase(
         "Test products_by_location on flat_childs with period closed"
         self.test_products_by_location_flat_childs(period_closed=True)
 
+    def test_products_by_location_flat_childs_ledger(self):
+        "Test products_by_location on flat_childs with ledger"
+        with patch.object(ledger, 'ENABLED', True):
+            self.test_products_by_location_flat_childs()
+
     @with_transaction()
     def test_products_by_location_2nd_level_flat_childs(self):
         "Test products_by_location on 2nd level flat_childs"
@@ -738,6 +886,11 @@ class StockTestCase(
                         today + relativedelta(days=5), product.id): -3,
                     })
 
+    def test_products_by_location_grouped_by_date_ledger(self):
+        "Test products_by_location grouped by date with ledger"
+        with patch.object(ledger, 'ENABLED', True):
+            self.test_products_by_location_grouped_by_date()
+
     @with_transaction()
     def test_templates_by_location(self, period_closed=False):
         "Test products_by_location grouped by template"
@@ -991,6 +1144,67 @@ class StockTestCase(
                         }])
             self.assertRaises(PeriodCloseError, Period.close, [period])
 
+    @with_transaction()
+    def test_period_close_many(self):
+        "Test closing many periods at once"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Period = pool.get('stock.period')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template, = Template.create([{
+                    'name': "Product",
+                    'type': 'goods',
+                    'default_uom': unit.id,
+                    }])
+        product, = Product.create([{
+                    'template': template.id,
+                    }])
+        supplier, = Location.search([('code', '=', 'SUP')])
+        customer, = Location.search([('code', '=', 'CUS')])
+        storage, = Location.search([('code', '=', 'STO')])
+        company = create_company()
+        with set_company(company):
+            today = datetime.date.today()
+
+            moves = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': quantity,
+                        'from_location': from_location.id,
+                        'to_location': to_location.id,
+                        'effective_date': today + relativedelta(days=days),
+                        'company': company.id,
+                        'unit_price': Decimal('1'),
+                        'currency': company.currency.id,
+                        } for quantity, from_location, to_location, days in [
+                        (10, supplier, storage, -6),
+                        (5, supplier, storage, -4),
+                        (3, storage, customer, -2),
+                        ]])
+            Move.do(moves)
+
+            periods = Period.create([{
+                        'date': today + relativedelta(days=days),
+                        'company': company.id,
+                        } for days in [-5, -3, -1]])
+            Period.close(periods)
+
+            for period, quantities in zip(periods, [
+                        {supplier: -10, storage: 10},
+                        {supplier: -15, storage: 15},
+                        {supplier: -15, storage: 12, customer: 3},
+                        ]):
+                self.assertEqual(period.state, 'closed')
+                self.assertEqual({
+                        c.location: c.internal_quantity
+                        for c in period.caches if c.product == product},
+                    quantities)
+
     @with_transaction()
     def test_check_origin(self):
         'Test Move check_origin'
@@ -1030,6 +1244,153 @@ class StockTestCase(
             self.assertRaises(MoveOriginWarning, Move.check_origin, moves,
                 {'customer'})
 
+    @with_transaction()
+    def test_inventory_add_counts(self):
+        "Test add counts to inventory"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Inventory = pool.get('stock.inventory')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template, = Template.create([{
+                    'name': 'Test Inventory.add_counts',
+                    'type': 'goods',
+                    'default_uom': unit.id,
+                    }])
+        product1, product2, product3 = Product.create([{
+                    'template': template.id,
+                    }] * 3)
+        supplier, = Location.search([('code', '=', 'SUP')])
+        storage, = Location.search([('code', '=', 'STO')])
+        company = create_company()
+        with set_company(company):
+            today = datetime.date.today()
+            moves = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': quantity,
+                        'from_location': supplier.id,
+                        'to_location': storage.id,
+                        'effective_date': today,
+                        'company': company.id,
+                        'unit_price': Decimal(1),
+                        'currency': company.currency.id,
+                        } for product, quantity in [
+                        (product1, 5), (product2, 3)]])
+            Move.do(moves)
+
+            inventory, = Inventory.create([{
+                        'location': storage.id,
+                        'date': today,
+                        'company': company.id,
+                        'empty_quantity': 'keep',
+                        }])
+            Inventory.complete_lines([inventory])
+            self.assertEqual(len(inventory.lines), 2)
+
+            Inventory.add_counts(inventory, iter([
+                        ((product1.id,), 2),
+                        ([product1.id], 2),
+                        ((product3.id,), 1),
+                        ((product3.id,), 1),
+                        ((product2.id,), 3),
+                        ]), size=2)
+
+            self.assertEqual(
+                {(l.product, l.expected_quantity, l.quantity)
+                    for l in inventory.lines}, {
+                    (product1, 5, 4),
+                    (product2, 3, 3),
+                    (product3, 0, 2),
+                    })
+
+            Inventory.confirm([inventory])
+            with Transaction().set_context(locations=[storage.id]):
+                self.assertEqual(
+                    [p.quantity for p in Product.browse(
+                            [product1, product2, product3])],
+                    [4, 3, 2])
+
+            with self.assertRaises(AccessError):
+                Inventory.add_counts(inventory, [((product1.id,), 1)])
+
+    @with_transaction()
+    def test_recompute_cost_price_average_start(self):
+        "Test recompute average cost price from start"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Queue = pool.get('ir.queue')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        supplier, = Location.search([('code', '=', 'SUP')])
+        storage, = Location.search([('code', '=', 'STO')])
+        customer, = Location.search([('code', '=', 'CUS')])
+        company = create_company()
+        with set_company(company):
+            template, = Template.create([{
+                        'name': 'Test recompute_cost_price',
+                        'type': 'goods',
+                        'default_uom': unit.id,
+                        'cost_price_method': 'average',
+                        }])
+            product, = Product.create([{
+                        'template': template.id,
+                        }])
+            date = datetime.date(2024, 1, 1)
+            values = [
+                (10, supplier, storage, Decimal(1)),
+                (5, storage, customer, Decimal(10)),
+                (5, supplier, storage, Decimal(4)),
+                (2, storage, customer, Decimal(10)),
+                ]
+            moves = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': quantity,
+                        'from_location': from_location.id,
+                        'to_location': to_location.id,
+                        'effective_date': date + datetime.timedelta(days=i),
+                        'company': company.id,
+                        'unit_price': unit_price,
+                        'currency': company.currency.id,
+                        } for i, (quantity, from_location, to_location,
+                        unit_price) in enumerate(values)])
+            Move.do(moves)
+
+            cost_price = product.recompute_cost_price_average()
+            self.assertEqual(cost_price, Decimal('2.5'))
+            self.assertEqual(
+                [m.cost_price for m in Move.browse(moves)],
+                [Decimal(1), Decimal(1), Decimal('2.5'), Decimal('2.5')])
+
+            Move.write(moves, {'unit_price_updated': False})
+            Move.write(moves[2:], {
+                    'unit_price': Decimal(7),
+                    'unit_price_updated': True,
+                    })
+            Product.recompute_cost_price_from_moves()
+            task, = Queue.search([])
+            self.assertEqual(
+                task.data['method'], 'recompute_cost_price')
+            self.assertEqual(list(task.data['instances']), [product.id])
+            self.assertEqual(
+                task.data['kwargs'], {'start': moves[2].effective_date})
+
+            cost_price = product.recompute_cost_price_average(
+                start=moves[2].effective_date)
+            self.assertEqual(cost_price, Decimal(4))
+            self.assertEqual(
+                [m.cost_price for m in Move.browse(moves)],
+                [Decimal(1), Decimal(1), Decimal(4), Decimal(4)])
+
     def test_assign_try(self):
         'Test Move assign_try'
         for quantity, quantities, success, result in [
@@ -1104,6 +1465,257 @@ class StockTestCase(
                 states[state].sort()
             self.assertEqual(states, result, msg=msg)
 
+    @with_transaction()
+    def test_shipment_assign_try_skip_locked(self):
+        "Test shipment assign_try_skip_locked"
+        pool = Pool()
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Uom = pool.get('product.uom')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Shipment = pool.get('stock.shipment.internal')
+        Date = pool.get('ir.date')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template = Template(name="Product", type='goods', default_uom=unit)
+        template.save()
+        product = Product(template=template.id)
+        product.save()
+
+        lost_found, = Location.search([('type', '=', 'lost_found')])
+        storage, = Location.search([('code', '=', 'STO')])
+        storage2, = Location.create([{
+                    'name': "Storage 2",
+                    'type': 'storage',
+                    'parent': storage.parent.id,
+                    }])
+
+        company = create_company()
+        with set_company(company):
+            move, = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': 5,
+                        'from_location': lost_found.id,
+                        'to_location': storage.id,
+                        'company': company.id,
+                        }])
+            Move.do([move])
+
+            shipment, = Shipment.create([{
+                        'company': company.id,
+                        'from_location': storage.id,
+                        'to_location': storage2.id,
+                        'planned_date': Date.today(),
+                        'planned_start_date': Date.today(),
+                        'moves': [('create', [{
+                                        'product': product.id,
+                                        'unit': unit.id,
+                                        'quantity': 3,
+                                        'from_location': storage.id,
+                                        'to_location': storage2.id,
+                                        'company': company.id,
+                                        }])],
+                        }])
+            Shipment.wait([shipment])
+
+            Shipment.assign_try_skip_locked([shipment])
+
+            self.assertEqual(shipment.state, 'assigned')
+
+    @with_transaction()
+    def test_cron_shipment_assign_try_priority(self):
+        "Test cron assigns shipments by priority"
+        pool = Pool()
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Uom = pool.get('product.uom')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Shipment = pool.get('stock.shipment.internal')
+        Cron = pool.get('ir.cron')
+        Queue = pool.get('ir.queue')
+        Date = pool.get('ir.date')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template = Template(name="Product", type='goods', default_uom=unit)
+        template.save()
+        product = Product(template=template.id)
+        product.save()
+
+        lost_found, = Location.search([('type', '=', 'lost_found')])
+        storage, = Location.search([('code', '=', 'STO')])
+        storage2, = Location.create([{
+                    'name': "Storage 2",
+                    'type': 'storage',
+                    'parent': storage.parent.id,
+                    }])
+        today = Date.today()
+        yesterday = today - datetime.timedelta(days=1)
+
+        company = create_company()
+        with set_company(company):
+            move, = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': 5,
+                        'from_location': lost_found.id,
+                        'to_location': storage.id,
+                        'company': company.id,
+                        }])
+            Move.do([move])
+
+            shipments = Shipment.create([{
+                        'company': company.id,
+                        'from_location': storage.id,
+                        'to_location': storage2.id,
+                        'planned_date': date,
+                        'planned_start_date': date,
+                        'moves': [('create', [{
+                                        'product': product.id,
+                                        'unit': unit.id,
+                                        'quantity': 3,
+                                        'from_location': storage.id,
+                                        'to_location': storage2.id,
+                                        'company': company.id,
+                                        }])],
+                        } for date in [today, yesterday]])
+            Shipment.wait(shipments)
+
+            Cron.stock_shipment_assign_try()
+            transaction = Transaction()
+            self.assertEqual(len(transaction.tasks), 1)
+            while transaction.tasks:
+                Queue(transaction.tasks.pop(0)).run()
+
+            self.assertEqual(
+                [s.state for s in Shipment.browse(shipments)],
+                ['waiting', 'assigned'])
+
+    @with_transaction()
+    def test_cron_shipment_assign_partition(self):
+        "Test partition of shipments to assign by product"
+        pool = Pool()
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Uom = pool.get('product.uom')
+        Location = pool.get('stock.location')
+        Shipment = pool.get('stock.shipment.internal')
+        Cron = pool.get('ir.cron')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template = Template(name="Product", type='goods', default_uom=unit)
+        template.save()
+        product1, product2, product3 = Product.create(
+            [{'template': template.id}] * 3)
+
+        storage, = Location.search([('code', '=', 'STO')])
+        storage2, = Location.create([{
+                    'name': "Storage 2",
+                    'type': 'storage',
+                    'parent': storage.parent.id,
+                    }])
+
+        company = create_company()
+        with set_company(company):
+            shipments = Shipment.create([{
+                        'company': company.id,
+                        'from_location': storage.id,
+                        'to_location': storage2.id,
+                        'moves': [('create', [{
+                                        'product': product.id,
+                                        'unit': unit.id,
+                                        'quantity': 1,
+                                        'from_location': storage.id,
+                                        'to_location': storage2.id,
+                                        'company': company.id,
+                                        } for product in products])],
+                        } for products in [
+                        [product1], [product2], [product3],
+                        [product3, product1], []]])
+            shipment1, shipment2, shipment3, shipment4, shipment5 = shipments
+
+            self.assertEqual(
+                Cron._stock_shipment_assign_partition(shipments),
+                [[shipment1, shipment3, shipment4], [shipment2], [shipment5]])
+
+    @with_transaction()
+    def test_shipment_out_process_wave(self):
+        "Test customer shipments processed by wave"
+        pool = Pool()
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Uom = pool.get('product.uom')
+        Location = pool.get('stock.location')
+        Move = pool.get('stock.move')
+        Party = pool.get('party.party')
+        Shipment = pool.get('stock.shipment.out')
+        Date = pool.get('ir.date')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template = Template(name="Product", type='goods', default_uom=unit)
+        template.save()
+        product = Product(template=template.id)
+        product.save()
+        customer = Party(name="Customer", addresses=[{}])
+        customer.save()
+        address, = customer.addresses
+
+        lost_found, = Location.search([('type', '=', 'lost_found')])
+        warehouse, = Location.search([('type', '=', 'warehouse')])
+        storage, = Location.search([('code', '=', 'STO')])
+        output, = Location.search([('code', '=', 'OUT')])
+        customer_loc, = Location.search([('code', '=', 'CUS')])
+
+        company = create_company()
+        with set_company(company):
+            today = Date.today()
+            move, = Move.create([{
+                        'product': product.id,
+                        'unit': unit.id,
+                        'quantity': 5,
+                        'from_location': lost_found.id,
+                        'to_location': storage.id,
+                        'company': company.id,
+                        }])
+            Move.do([move])
+
+            shipments = Shipment.create([{
+                        'company': company.id,
+                        'customer': customer.id,
+                        'delivery_address': address.id,
+                        'warehouse': warehouse.id,
+                        'warehouse_storage': storage.id,
+                        'warehouse_output': output.id,
+                        'planned_date': today,
+                        'moves': [('create', [{
+                                        'product': product.id,
+                                        'unit': unit.id,
+                                        'quantity': quantity,
+                                        'from_location': output.id,
+                                        'to_location': customer_loc.id,
+                                        'company': company.id,
+                                        'unit_price': Decimal(1),
+                                        'currency': company.currency.id,
+                                        }])],
+                        } for quantity in [2, 1, 3]])
+            Shipment.wait(shipments)
+
+            Shipment.assign_try(shipments[:2])
+            route = Shipment.get_pick_route(shipments)
+            self.assertEqual(route, [(storage, product, 3)])
+            self.assertEqual(
+                Shipment.__rpc__['get_pick_route'].result(route),
+                [(storage.id, product.id, 3)])
+
+            remaining = Shipment.process_wave(shipments)
+
+            self.assertEqual(remaining, [shipments[2]])
+            self.assertEqual(
+                [s.state for s in shipments],
+                ['picked', 'picked', 'waiting'])
+
     @with_transaction()
     def test_assign_try_chained(self):
         "Test Move assign_try chained"
@@ -268,13 +268,21 @@ class Forecast(Workflow, ModelSQL, ModelView):
         'Create stock moves for the forecast ids'
         pool = Pool()
         Line = pool.get('stock.forecast.line')
-        to_save = []
-        for forecast in forecasts:
-            if forecast.state == 'done':
-                for line in forecast.lines:
-                    line.moves += tuple(line.get_moves())
-                    to_save.append(line)
-        Line.save(to_save)
+        LineMove = pool.get('stock.forecast.line-stock.move')
+        Move = pool.get('stock.move')
+        lines = Line.browse([
+                l for f in forecasts if f.state == 'done' for l in f.lines])
+        quantities = Line.get_quantity_executed(
+            list(lines), 'quantity_executed')
+        line_moves = []
+        for line in lines:
+            moves = line.get_moves(quantity_executed=quantities[line.id])
+            line_moves.extend((line, m) for m in moves)
+        Move.save([m for _, m in line_moves])
+        LineMove.create([{
+                    'line': l.id,
+                    'move': m.id,
+                    } for l, m in line_moves])
 
     @staticmethod
     def delete_moves(forecasts):
@@ -452,13 +460,15 @@ class ForecastLine(ModelSQL, ModelView):
         default.setdefault('moves', None)
         return super(ForecastLine, cls).copy(lines, default=default)
 
-    def get_moves(self):
+    def get_moves(self, quantity_executed=None):
         'Get stock moves for the forecast line'
         pool = Pool()
         Move = pool.get('stock.move')
         Date = pool.get('ir.date')
 
         assert not self.moves
+        if quantity_executed is None:
+            quantity_executed = self.quantity_executed
 
         today = Date.today()
         from_date = self.forecast.from_date
@@ -467,38 +477,49 @@ class ForecastLine(ModelSQL, ModelView):
         to_date = self.forecast.to_date
         if to_date < today:
             return []
-        if self.quantity_executed >= self.quantity:
+        if quantity_executed >= self.quantity:
             return []
 
         delta = to_date - from_date
         delta = delta.days + 1
-        nb_packet = ((self.quantity - self.quantity_executed)
+        nb_packet = ((self.quantity - quantity_executed)
             // self.minimal_quantity)
         distribution = self.distribute(delta, nb_packet)
 
+        from_location = self.forecast.warehouse.storage_location
+        to_location = self.forecast.destination
+        company = self.forecast.company
+        unit_price = 0 if to_location.type == 'customer' else None
         moves = []
         for day, qty in distribution.items():
             if qty == 0.0:
                 continue
             move = Move()
-            move.from_location = self.forecast.warehouse.storage_location
-            move.to_location = self.forecast.destination
+            move.from_location = from_location
+            move.to_location = to_location
             move.product = self.product
             move.unit = self.unit
             move.quantity = qty * self.minimal_quantity
             move.planned_date = from_date + datetime.timedelta(day)
-            move.company = self.forecast.company
-            move.currency = self.forecast.company.currency
-            move.unit_price = (
-                0 if self.forecast.destination.type == 'customer' else None)
+            move.company = company
+            move.currency = company.currency
+            move.unit_price = unit_price
             moves.append(move)
         return moves
 
     @classmethod
     def delete_moves(cls, lines):
         'Delete stock moves of the forecast line'
-        Move = Pool().get('stock.move')
-        Move.delete([m for l in lines for m in l.moves])
+        pool = Pool()
+        Move = pool.get('stock.move')
+        LineMove = pool.get('stock.forecast.line-stock.move')
+        moves = []
+        for sub_lines in grouped_slice(lines):
+            line_moves = LineMove.search([
+                    ('line', 'in', [l.id for l in sub_lines]),
+                    ])
+            moves.extend(lm.move for lm in line_moves)
+        Move.delete(moves)
 
     def distribute(self, delta, qty):
         'Distribute qty over delta'
@@ -617,15 +638,35 @@ class ForecastComplete(Wizard):
         to_save = []
         # Ensure context is set
         self.ask.products = map(int, self.ask.products)
+        quantities = self.get_quantities(self.ask.products)
         for product in self.ask.products:
             line = product2line.get(product, ForecastLine())
-            self._fill_line(line, product)
+            self._fill_line(line, product, quantity=quantities[product.id])
             to_save.append(line)
         ForecastLine.save(to_save)
         return 'end'
 
-    def _fill_line(self, line, product):
-        quantity = max(product.quantity, 0)
+    def get_quantities(self, products):
+        "Return the quantity shipped for each product in one query"
+        pool = Pool()
+        Product = pool.get('product.product')
+        product_ids = [p.id for p in products]
+        with Transaction().set_context(
+                company=self.ask.company.id,
+                stock_destinations=[self.ask.destination.id],
+                stock_date_start=self.ask.from_date,
+                stock_date_end=self.ask.to_date,
+                stock_invert=True):
+            pbl = Product.products_by_location(
+                [self.ask.warehouse.id], with_childs=True,
+                grouping_filter=(product_ids,))
+        return {
+            p: pbl.get((self.ask.warehouse.id, p), 0) for p in product_ids}
+
+    def _fill_line(self, line, product, quantity=None):
+        if quantity is None:
+            quantity = product.quantity
+        quantity = max(quantity, 0)
         line.product = product
         line.quantity = quantity
         line.unit = product.default_uom
@@ -216,6 +216,65 @@ class StockForecastTestCase(CompanyTestMixin, ModuleTestCase):
             self.assertGreaterEqual(
                 min(m.planned_date for m in line.moves), today)
 
+    @with_transaction()
+    def test_create_moves_many_lines(self):
+        "Test create moves for many lines"
+        pool = Pool()
+        Uom = pool.get('product.uom')
+        Template = pool.get('product.template')
+        Product = pool.get('product.product')
+        Location = pool.get('stock.location')
+        Forecast = pool.get('stock.forecast')
+        Move = pool.get('stock.move')
+
+        unit, = Uom.search([('name', '=', 'Unit')])
+        template, = Template.create([{
+                    'name': 'Test create_moves',
+                    'type': 'goods',
+                    'default_uom': unit.id,
+                    }])
+        products = Product.create([{
+                    'template': template.id,
+                    } for _ in range(10)])
+        customer, = Location.search([('code', '=', 'CUS')])
+        warehouse, = Location.search([('code', '=', 'WH')])
+        company = create_company()
+        with set_company(company):
+            today = datetime.date.today()
+
+            forecasts = Forecast.create([{
+                        'warehouse': warehouse.id,
+                        'destination': customer.id,
+                        'from_date': today + relativedelta(months=m, day=1),
+                        'to_date': today + relativedelta(months=m, day=10),
+                        'company': company.id,
+                        'lines': [
+                            ('create', [{
+                                        'product': product.id,
+                                        'quantity': 5,
+                                        'unit': unit.id,
+                                        'minimal_quantity': 1,
+                                        } for product in products],
+                                ),
+                            ],
+                        } for m in [1, 2]])
+            Forecast.confirm(forecasts)
+
+            Forecast.create_moves(forecasts)
+            for forecast in forecasts:
+                for line in forecast.lines:
+                    self.assertEqual(len(line.moves), 5)
+                    self.assertEqual(
+                        {m.product for m in line.moves}, {line.product})
+                    self.assertTrue(all(
+                            forecast.from_date
+                            <= m.planned_date
+                            <= forecast.to_date
+                            for m in line.moves))
+
+            Forecast.delete_moves(forecasts)
+            self.assertEqual(Move.search([], count=True), 0)
+
     @with_transaction()
     def test_create_moves_after(self):
         "Test create not moves after end date"
@@ -237,6 +237,21 @@ class Move(metaclass=PoolMeta):
                             gettext('stock_lot_sled.msg_move_lot_expired',
                                 **values))
 
+    @classmethod
+    def _quantities_use_ledger(cls, grouping):
+        pool = Pool()
+        Date = pool.get('ir.date')
+        context = Transaction().context
+        today = Date.today()
+        use_ledger = super()._quantities_use_ledger(grouping)
+        # The ledger can not exclude the expired lots
+        stock_date_end = context.get('stock_date_end') or datetime.date.max
+        if (use_ledger and not context.get('skip_lot_sled')
+                and ((stock_date_end == today and context.get('forecast'))
+                    or stock_date_end > today)):
+            use_ledger = False
+        return use_ledger
+
     @classmethod
     def compute_quantities_query(cls, location_ids, with_childs=False,
             grouping=('product',), grouping_filter=None):
@@ -3,6 +3,7 @@
 import datetime
 import operator
 from collections import defaultdict
+from itertools import chain
 
 from trytond.model import ModelSQL, ValueMixin, fields
 from trytond.pool import Pool, PoolMeta
@@ -108,6 +109,19 @@ class PurchaseRequest(metaclass=PoolMeta):
                         stock_date_end=min_date):
                     pbl = Product.products_by_location(warehouse_ids,
                         with_childs=True, grouping_filter=(product_ids,))
+                # Compute the deltas of all warehouses at once
+                with Transaction().set_context(
+                        forecast=True,
+                        stock_date_start=min_date,
+                        stock_date_end=max_date):
+                    pbl_dates = Product.products_by_location(
+                        warehouse_ids, with_childs=True,
+                        grouping=('date', 'product'),
+                        grouping_filter=(None, product_ids))
+                warehouse_deltas = defaultdict(dict)
+                for (warehouse_id, date, product_id), qty in (
+                        pbl_dates.items()):
+                    warehouse_deltas[warehouse_id][date, product_id] = qty
                 for warehouse_id in warehouse_ids:
                     min_date_qties = defaultdict(int,
                         ((x, pbl.pop((warehouse_id, x), 0))
@@ -121,7 +135,8 @@ class PurchaseRequest(metaclass=PoolMeta):
                     shortages = cls.get_shortage(
                         warehouse_id, product_ids, min_date, max_date,
                         min_date_qties=min_date_qties,
-                        order_points=product2ops)
+                        order_points=product2ops,
+                        deltas=warehouse_deltas[warehouse_id])
 
                     for product in sub_products:
                         if product.id not in shortages:
@@ -301,7 +316,7 @@ class PurchaseRequest(metaclass=PoolMeta):
 
     @classmethod
     def get_shortage(cls, location_id, product_ids, min_date, max_date,
-            min_date_qties, order_points):
+            min_date_qties, order_points, deltas=None):
         """
         Return for each product the first date between min_date and max_date
         where the stock quantity is less than the minimal quantity and the
@@ -312,6 +327,8 @@ class PurchaseRequest(metaclass=PoolMeta):
 
         min_date_qty is the quantities for each products at the min_date.
         order_points is a dictionary that links products to order point.
+        deltas is a dictionary that links date and product to the quantity
+        variation, it is computed if not provided.
         """
         Product = Pool().get('product.product')
 
@@ -324,42 +341,36 @@ class PurchaseRequest(metaclass=PoolMeta):
             if order_point:
                 min_quantities[product_id] = order_point.min_quantity
 
-        with Transaction().set_context(
-                forecast=True,
-                stock_date_start=min_date,
-                stock_date_end=max_date):
-            pbl = Product.products_by_location(
-                [location_id], with_childs=True,
-                grouping=('date', 'product'),
-                grouping_filter=(None, product_ids))
-        pbl_dates = defaultdict(dict)
-        for key, qty in pbl.items():
-            date, product_id = key[1:]
-            pbl_dates[date][product_id] = qty
-
-        current_date = min_date
-        current_qties = min_date_qties.copy()
-        products_to_check = product_ids.copy()
-        while (current_date < max_date) or (current_date == min_date):
-            for product_id in products_to_check:
-                current_qty = current_qties[product_id]
-                min_quantity = min_quantities[product_id]
-                res_qty = res_qties.get(product_id)
-                res_date = res_dates.get(product_id)
-                if min_quantity is not None and current_qty < min_quantity:
-                    if not res_date:
-                        res_dates[product_id] = current_date
+        if deltas is None:
+            with Transaction().set_context(
+                    forecast=True,
+                    stock_date_start=min_date,
+                    stock_date_end=max_date):
+                pbl = Product.products_by_location(
+                    [location_id], with_childs=True,
+                    grouping=('date', 'product'),
+                    grouping_filter=(None, product_ids))
+            deltas = {key[1:]: qty for key, qty in pbl.items()}
+
+        # Only the dates with a variation need to be checked
+        product_deltas = defaultdict(list)
+        for (date, product_id), qty in deltas.items():
+            if date is not None and min_date < date < max_date:
+                product_deltas[product_id].append((date, qty))
+
+        for product_id in product_ids:
+            min_quantity = min_quantities[product_id]
+            if min_quantity is None:
+                continue
+            current_qty = min_date_qties[product_id]
+            for date, qty in chain(
+                    [(min_date, 0)], sorted(product_deltas[product_id])):
+                current_qty += qty
+                if current_qty < min_quantity:
+                    res_qty = res_qties.get(product_id)
+                    if product_id not in res_dates:
+                        res_dates[product_id] = date
                     if (not res_qty) or (current_qty < res_qty):
                         res_qties[product_id] = current_qty
 
-            if current_date == datetime.date.max:
-                break
-            current_date += datetime.timedelta(1)
-
-            pbl = pbl_dates[current_date]
-            products_to_check.clear()
-            for product_id, qty in pbl.items():
-                current_qties[product_id] += qty
-                products_to_check.append(product_id)
-
         return {x: (res_dates.get(x), res_qties.get(x)) for x in product_ids}
@@ -155,5 +155,39 @@ class StockSupplyTestCase(CompanyTestMixin, ModuleTestCase):
                 self.assertListEqual(
                     OrderPoint.search(clause), result, msg=clause)
 
+    @with_transaction()
+    def test_get_shortage(self):
+        "Test get_shortage with deltas"
+        pool = Pool()
+        PurchaseRequest = pool.get('purchase.request')
+
+        class OrderPoint:
+            min_quantity = 5
+
+        today = datetime.date(2024, 1, 1)
+        day = datetime.timedelta(days=1)
+        deltas = {
+            (today, 1): -10,
+            (today + 3 * day, 1): -3,
+            (today + 5 * day, 1): -4,
+            (today + 7 * day, 1): 10,
+            (today + 8 * day, 1): -20,
+            (today + 10 * day, 1): -50,
+            (today + 2 * day, 2): -20,
+            (today + 4 * day, 3): -20,
+            }
+        min_date_qties = {1: 10, 2: 10, 3: 2}
+        order_points = {(1, 1): OrderPoint(), (1, 2): OrderPoint()}
+
+        shortages = PurchaseRequest.get_shortage(
+            1, [1, 2, 3], today, today + 10 * day,
+            min_date_qties, order_points, deltas=deltas)
+
+        self.assertEqual(shortages, {
+                1: (today + 5 * day, -7),
+                2: (today + 2 * day, -10),
+                3: (today + 4 * day, -18),
+                })
+
 
 del ModuleTestCase
@@ -5,7 +5,7 @@
 
     Sao.rpc = function(args, session=null, async=true, process_exception=true) {
         var dfd = jQuery.Deferred(),
-            result;
+            result, etag;
         if (!session) {
             session = new Sao.Session();
         }
@@ -23,13 +23,33 @@
                     return result;
                 }
             }
+            etag = session.cache.etag(
+                args.method,
+                JSON.stringify(Sao.rpc.prepareObject(params)));
         }
 
         var timeoutID = Sao.common.processing.show();
         const id_ = Sao.rpc.id++;
 
         var ajax_success = function(data, status_, query) {
-            if (data === null) {
+            if ((query.status == 304) && etag) {
+                var expire = parseInt(
+                    query.getResponseHeader('X-Tryton-Cache'), 10) || 0;
+                result = session.cache.revalidate(
+                    args.method,
+                    JSON.stringify(Sao.rpc.prepareObject(params)),
+                    expire);
+                if (result !== undefined) {
+                    dfd.resolve(result);
+                } else if (async) {
+                    // The cache has been cleared since the request
+                    Sao.rpc(args, session, async, process_exception)
+                        .then(dfd.resolve, dfd.reject);
+                } else {
+                    result = Sao.rpc(args, session, async, process_exception);
+                    dfd.resolve(result);
+                }
+            } else if (data === null) {
                 Sao.common.warning.run('',
                         Sao.i18n.gettext('Unable to reach the server.'))
                     .always(dfd.reject);
@@ -111,7 +131,8 @@
                             args.method,
                             JSON.stringify(Sao.rpc.prepareObject(params)),
                             cache,
-                            result);
+                            result,
+                            query.getResponseHeader('ETag'));
                     }
                 }
                 dfd.resolve(result);
@@ -168,11 +189,15 @@
             }
         };
 
+        var headers = {
+            'Authorization': 'Session ' + session.get_auth(),
+        };
+        if (etag) {
+            headers['If-None-Match'] = etag;
+        }
         jQuery.ajax({
             'async': async,
-            'headers': {
-                'Authorization': 'Session ' + session.get_auth()
-            },
+            'headers': headers,
             'contentType': 'application/json',
             'data': JSON.stringify(Sao.rpc.prepareObject({
                 'id': id_,
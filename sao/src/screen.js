@@ -812,6 +812,7 @@
                 this.readonly = true;
             }
             this.search_count = 0;
+            this.search_count_exact = true;
             this.new_group(attributes.context || {});
             this.current_record = null;
             this.screen_container = new Sao.ScreenContainer(
@@ -1082,17 +1083,20 @@
                             (ids.length == this.limit)) {
                             count_prm = this.model.execute(
                                 'search_count',
-                                [domain, 0, this.count_limit], context,
+                                [domain, 0, this.count_limit, true], context,
                                 true, false)
-                                .then(count => {
+                                .then(([count, exact]) => {
                                     this.search_count = count;
+                                    this.search_count_exact = exact;
                                     return this.search_count;
                                 }, () => {
                                     this.search_count = 0;
+                                    this.search_count_exact = true;
                                     return this.search_count;
                                 });
                         } else {
                             this.search_count = ids.length;
+                            this.search_count_exact = true;
                         }
                     }
                     return count_prm.then(count => {
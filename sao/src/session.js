@@ -579,11 +579,12 @@
         cached: function(prefix) {
             return prefix in this.store;
         },
-        set: function(prefix, key, expire, value) {
+        set: function(prefix, key, expire, value, etag=null) {
             expire = new Date(new Date().getTime() + expire * 1000);
             Sao.setdefault(this.store, prefix, {})[key] = {
                 'expire': expire,
                 'value': JSON.stringify(Sao.rpc.prepareObject(value)),
+                'etag': etag,
             };
         },
         get: function(prefix, key) {
@@ -593,12 +594,28 @@
                 return undefined;
             }
             if (data.expire < now) {
-                delete this.store[prefix][key];
+                // Keep expired value to be revalidated with its etag
                 return undefined;
             }
             Sao.Logger.info("(cached)", prefix, key);
             return Sao.rpc.convertJSONObject(jQuery.parseJSON(data.value));
         },
+        etag: function(prefix, key) {
+            var data = Sao.setdefault(this.store, prefix, {})[key];
+            if (!data) {
+                return null;
+            }
+            return data.etag;
+        },
+        revalidate: function(prefix, key, expire) {
+            var data = Sao.setdefault(this.store, prefix, {})[key];
+            if (!data) {
+                return undefined;
+            }
+            data.expire = new Date(new Date().getTime() + expire * 1000);
+            Sao.Logger.info("(revalidated)", prefix, key);
+            return Sao.rpc.convertJSONObject(jQuery.parseJSON(data.value));
+        },
         clear: function(prefix) {
             if (prefix) {
                 this.store[prefix] = {};
@@ -1536,8 +1536,10 @@
                 msg = (
                     name + '@' +
                     Sao.common.humanize(size) + '/' +
+                    (this.screen.search_count_exact ? '' : '~') +
                     Sao.common.humanize(max_size));
-                if (max_size >= this.screen.count_limit) {
+                if (this.screen.search_count_exact &&
+                    (max_size >= this.screen.count_limit)) {
                     msg += '+';
                 }
             } else {
@@ -603,9 +603,12 @@ class Form(TabContent):
         set_sensitive('next', self.screen.has_next())
 
         if size < max_size:
-            msg = "%s@%s/%s" % (
-                name, common.humanize(size), common.humanize(max_size))
-            if max_size >= self.screen.count_limit:
+            msg = "%s@%s/%s%s" % (
+                name, common.humanize(size),
+                '' if self.screen.search_count_exact else '~',
+                common.humanize(max_size))
+            if (self.screen.search_count_exact
+                    and max_size >= self.screen.count_limit):
                 msg += "+"
         else:
             msg = "%s/%s" % (name, common.humanize(size))
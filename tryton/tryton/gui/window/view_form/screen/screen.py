@@ -53,6 +53,7 @@ class Screen:
                 or MODELACCESS[model_name]['create']):
             self.readonly = True
         self.search_count = 0
+        self.search_count_exact = True
         if not attributes.get('row_activate'):
             self.row_activate = self.default_row_activate
         else:
@@ -305,14 +306,16 @@ class Screen:
         if not only_ids:
             if self.limit is not None and len(ids) == self.limit:
                 try:
-                    self.search_count = RPCExecute(
+                    self.search_count, self.search_count_exact = RPCExecute(
                         'model', self.model_name, 'search_count',
-                        domain, 0, self.count_limit, context=context,
+                        domain, 0, self.count_limit, True, context=context,
                         process_exception=False)
                 except RPCException:
                     self.search_count = 0
+                    self.search_count_exact = True
             else:
                 self.search_count = len(ids)
+                self.search_count_exact = True
         self.screen_container.but_prev.set_sensitive(bool(self.offset))
         if (self.limit is not None
                 and len(ids) == self.limit
@@ -156,6 +156,7 @@ class Transport(xmlrpc.client.SafeTransport):
         self.__fingerprints = fingerprints
         self.__ca_certs = ca_certs
         self.session = session
+        self.if_none_match = None
 
     def getparser(self):
         target = JSONUnmarshaller()
@@ -163,15 +164,17 @@ class Transport(xmlrpc.client.SafeTransport):
         return parser, target
 
     def parse_response(self, response):
-        cache = None
+        cache, etag = None, None
         if hasattr(response, 'getheader'):
             cache = int(response.getheader('X-Tryton-Cache', 0))
+            etag = response.getheader('ETag')
         response = super().parse_response(response)
         if cache:
             try:
                 response['cache'] = int(cache)
             except ValueError:
                 pass
+            response['etag'] = etag
         return response
 
     def get_host_info(self, host):
@@ -194,6 +197,8 @@ class Transport(xmlrpc.client.SafeTransport):
             if key == 'Content-Type':
                 val = 'application/json'
             connection.putheader(key, val)
+        if self.if_none_match:
+            connection.putheader('If-None-Match', self.if_none_match)
 
     def make_connection(self, host):
         if self._connection and host == self._connection[0]:
@@ -281,11 +286,13 @@ class ServerProxy(xmlrpc.client.ServerProxy):
         dumper = partial(json.dumps, cls=JSONEncoder, separators=(',', ':'))
         self.__id += 1
         id_ = self.__id
+        etag = None
         if self.__cache and self.__cache.cached(methodname):
             try:
                 return self.__cache.get(methodname, dumper(params))
             except KeyError:
-                pass
+                etag = self.__cache.etag(methodname, dumper(params))
+        self.__transport.if_none_match = etag
         request = dumper({
                 'id': id_,
                 'method': methodname,
@@ -303,6 +310,15 @@ class ServerProxy(xmlrpc.client.ServerProxy):
                             verbose=self.__verbose
                             )
                     except xmlrpc.client.ProtocolError as e:
+                        if e.errcode == HTTPStatus.NOT_MODIFIED and etag:
+                            try:
+                                return self.__cache.revalidate(
+                                    methodname, dumper(params),
+                                    int(e.headers.get('X-Tryton-Cache', 0)))
+                            except KeyError:
+                                # The cache has been cleared since the request
+                                etag = self.__transport.if_none_match = None
+                                continue
                         if e.errcode == HTTPStatus.SERVICE_UNAVAILABLE:
                             try:
                                 delay = int(e.headers.get('Retry-After', i))
@@ -342,7 +358,7 @@ class ServerProxy(xmlrpc.client.ServerProxy):
         if self.__cache and response.get('cache'):
             self.__cache.set(
                 methodname, dumper(params), response['cache'],
-                response['result'])
+                response['result'], response.get('etag'))
         return response['result']
 
     def close(self):
@@ -437,25 +453,45 @@ class _Cache:
     def cached(self, prefix):
         return prefix in self.store
 
-    def set(self, prefix, key, expire, value):
+    @staticmethod
+    def _expire(expire):
         if isinstance(expire, (int, float)):
             expire = datetime.timedelta(seconds=expire)
         if isinstance(expire, datetime.timedelta):
             expire = datetime.datetime.now() + expire
-        self.store[prefix][key] = (expire, deepcopy(value))
+        return expire
+
+    def set(self, prefix, key, expire, value, etag=None):
+        self.store[prefix][key] = (self._expire(expire), deepcopy(value), etag)
 
     def get(self, prefix, key):
         now = datetime.datetime.now()
         try:
-            expire, value = self.store[prefix][key]
+            expire, value, _ = self.store[prefix][key]
         except ValueError:
             raise KeyError
         if expire < now:
-            self.store.pop(key)
+            # Keep expired value to be revalidated with its etag
             raise KeyError
         logger.info('(cached) %s %s', prefix, key)
         return deepcopy(value)
 
+    def etag(self, prefix, key):
+        try:
+            _, _, etag = self.store[prefix][key]
+        except (KeyError, ValueError):
+            return None
+        return etag
+
+    def revalidate(self, prefix, key, expire):
+        try:
+            _, value, etag = self.store[prefix][key]
+        except ValueError:
+            raise KeyError
+        self.store[prefix][key] = (self._expire(expire), value, etag)
+        logger.info('(revalidated) %s %s', prefix, key)
+        return deepcopy(value)
+
     def clear(self, prefix=None):
         if prefix:
             self.store[prefix].clear()
@@ -161,6 +161,9 @@ setup(name=name,
         'qrcode': ['qrcode[pil]', 'webcolors'],
         'completion': ['argcomplete'],
         'email-validation': ['email-validator >= 2', 'dnspython'],
+        'orjson': ['orjson'],
+        'brotli': ['brotli'],
+        'zstd': ['zstandard'],
         },
     zip_safe=False,
     cmdclass={
@@ -37,6 +37,11 @@ class DatabaseInterface(object):
     def close(self):
         raise NotImplementedError
 
+    @classmethod
+    def stats(cls):
+        "Return the statistics of the connection pools"
+        return []
+
     @classmethod
     def create(cls, connection, database_name):
         raise NotImplementedError
@@ -69,6 +74,10 @@ class DatabaseInterface(object):
     def estimated_count(self, connection, table):
         raise NotImplementedError
 
+    def estimated_query_count(self, connection, query):
+        "Return the planner estimation of the number of rows of the query"
+        return None
+
     @classmethod
     def lock(cls, connection, table):
         raise NotImplementedError
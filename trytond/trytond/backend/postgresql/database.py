@@ -1,5 +1,6 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
+import itertools
 import json
 import logging
 import os
@@ -9,13 +10,14 @@ from collections import defaultdict
 from datetime import datetime
 from decimal import Decimal
 from itertools import chain, repeat
-from threading import RLock
+from threading import Condition, RLock, Timer
 
 from psycopg2 import Binary, connect
 from psycopg2.extensions import (
-    ISOLATION_LEVEL_REPEATABLE_READ, UNICODE, AsIs, cursor, register_adapter,
+    ISOLATION_LEVEL_REPEATABLE_READ, TRANSACTION_STATUS_IDLE,
+    TRANSACTION_STATUS_UNKNOWN, UNICODE, AsIs, cursor, register_adapter,
     register_type)
-from psycopg2.pool import PoolError, ThreadedConnectionPool
+from psycopg2.pool import PoolError
 from psycopg2.sql import SQL, Identifier
 
 try:
@@ -50,7 +52,21 @@ os.environ['PGTZ'] = os.environ.get('TZ', '')
 _timeout = config.getint('database', 'timeout')
 _minconn = config.getint('database', 'minconn', default=1)
 _maxconn = config.getint('database', 'maxconn', default=64)
+_conn_lifetime = config.getint('database', 'connection_lifetime', default=0)
+_conn_idle_timeout = config.getint(
+    'database', 'connection_idle_timeout', default=60)
+_pool_timeout = config.getint('database', 'pool_timeout', default=60)
 _default_name = config.get('database', 'default_name', default='template1')
+_replica_uris = list(filter(
+        None, config.get('database', 'replicas', default='').splitlines()))
+_replica_max_lag = config.getfloat(
+    'database', 'replica_max_lag', default=1)
+_replica_connect_timeout = config.getint(
+    'database', 'replica_connect_timeout', default=5)
+_replica_retry_interval = config.getfloat(
+    'database', 'replica_retry_interval', default=60)
+_replica_check_interval = config.getfloat(
+    'database', 'replica_check_interval', default=5)
 
 
 def unescape_quote(s):
@@ -72,6 +88,216 @@ class LoggingCursor(cursor):
         cursor.execute(self, sql, args)
 
 
+class ConnectionPool:
+    "Thread-safe pool of connections with statistics"
+
+    def __init__(
+            self, minconn, maxconn, lifetime=0, idle_timeout=0, **kwargs):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.lifetime = lifetime
+        self.idle_timeout = idle_timeout
+        self.closed = False
+        self._kwargs = kwargs
+        self._condition = Condition()
+        # The most recently released connections are at the end
+        self._idle = []
+        self._used = {}
+        self._created = {}
+        # The number of connections being opened outside the lock
+        self._connecting = 0
+        self._reaper = None
+        self.waits = 0
+        self.wait_time = 0
+        self.timeouts = 0
+        self.opened = 0
+        self.recycled = 0
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = connect(**self._kwargs)
+        with self._condition:
+            self._created[id(conn)] = time.monotonic()
+            self.opened += 1
+        return conn
+
+    def _close(self, conn):
+        if not conn.closed:
+            conn.close()
+
+    def _size(self):
+        return len(self._idle) + len(self._used) + self._connecting
+
+    def _expired(self, conn, now):
+        return (self.lifetime
+            and now - self._created.get(id(conn), now) > self.lifetime)
+
+    def _reap(self, now):
+        "Remove and return the idle connections to close"
+        to_close = []
+        while (self._idle
+                and self._size() > self.minconn
+                and now - self._idle[0][1] >= self.idle_timeout):
+            conn, _ = self._idle.pop(0)
+            self._created.pop(id(conn), None)
+            to_close.append(conn)
+        return to_close
+
+    def _schedule_reap(self):
+        "Schedule the reaping of the idle connections without activity"
+        if (self.idle_timeout and self._reaper is None and not self.closed
+                and self._idle and self._size() > self.minconn):
+            delay = self._idle[0][1] + self.idle_timeout - time.monotonic()
+            self._reaper = Timer(max(delay, 0), self._reap_idle)
+            self._reaper.daemon = True
+            self._reaper.start()
+
+    def _reap_idle(self):
+        with self._condition:
+            self._reaper = None
+            if self.closed:
+                return
+            to_close = self._reap(time.monotonic())
+            self._schedule_reap()
+        for conn in to_close:
+            self._close(conn)
+
+    def getconn(self, timeout=None):
+        "Return a connection waiting at most timeout seconds for a free one"
+        to_close = []
+        with self._condition:
+            if self.closed:
+                raise PoolError("connection pool is closed")
+            start = time.monotonic()
+            if not self._idle and self._size() >= self.maxconn:
+                self.waits += 1
+                if not self._condition.wait_for(
+                        lambda: (self.closed or self._idle
+                            or self._size() < self.maxconn),
+                        timeout):
+                    self.timeouts += 1
+                    self.wait_time += time.monotonic() - start
+                    raise PoolError("connection pool exhausted")
+                self.wait_time += time.monotonic() - start
+                if self.closed:
+                    raise PoolError("connection pool is closed")
+            now = time.monotonic()
+            conn = None
+            while self._idle and conn is None:
+                conn, _ = self._idle.pop()
+                if conn.closed or self._expired(conn, now):
+                    self._created.pop(id(conn), None)
+                    to_close.append(conn)
+                    self.recycled += 1
+                    conn = None
+            if conn is None:
+                # Reserve the slot of the new connection
+                self._connecting += 1
+            else:
+                self._used[id(conn)] = conn
+        for old in to_close:
+            self._close(old)
+        if conn is None:
+            # Do not block the pool while connecting
+            try:
+                conn = self._connect()
+            except BaseException:
+                with self._condition:
+                    self._connecting -= 1
+                    self._condition.notify()
+                raise
+            with self._condition:
+                self._connecting -= 1
+                if self.closed:
+                    self._created.pop(id(conn), None)
+                    self._close(conn)
+                    raise PoolError("connection pool is closed")
+                self._used[id(conn)] = conn
+        return conn
+
+    def putconn(self, conn, close=False):
+        if not close and not conn.closed:
+            status = conn.get_transaction_status()
+            if status == TRANSACTION_STATUS_UNKNOWN:
+                close = True
+            elif status != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+        with self._condition:
+            if self._used.pop(id(conn), None) is None:
+                raise PoolError("trying to put unkeyed connection")
+            now = time.monotonic()
+            if not close and self._expired(conn, now):
+                self.recycled += 1
+                close = True
+            if close or self.closed or conn.closed:
+                self._created.pop(id(conn), None)
+                to_close = [conn]
+            else:
+                self._idle.append((conn, now))
+                to_close = []
+            to_close.extend(self._reap(now))
+            self._schedule_reap()
+            self._condition.notify()
+        for conn in to_close:
+            self._close(conn)
+
+    def closeall(self):
+        with self._condition:
+            if self.closed:
+                raise PoolError("connection pool is closed")
+            self.closed = True
+            if self._reaper:
+                self._reaper.cancel()
+                self._reaper = None
+            to_close = [c for c, _ in self._idle]
+            to_close.extend(self._used.values())
+            self._idle.clear()
+            self._created.clear()
+            self._condition.notify_all()
+        for conn in to_close:
+            try:
+                self._close(conn)
+            except Exception:
+                pass
+
+    def stats(self):
+        with self._condition:
+            return {
+                'in_use': len(self._used),
+                'idle': len(self._idle),
+                'waits': self.waits,
+                'wait_time': self.wait_time,
+                'timeouts': self.timeouts,
+                'opened': self.opened,
+                'recycled': self.recycled,
+                }
+
+
+class Replica:
+    "Pool of connections to a replica with its availability"
+
+    def __init__(self, connpool):
+        self.connpool = connpool
+        # The time until which the replica is not used
+        self.unavailable_until = 0
+        # The time of the last check of the replication lag
+        self.checked = None
+
+    @property
+    def available(self):
+        return time.monotonic() >= self.unavailable_until
+
+    def set_unavailable(self, duration):
+        self.unavailable_until = time.monotonic() + duration
+        self.checked = None
+
+    @property
+    def check_needed(self):
+        return (self.checked is None
+            or time.monotonic() - self.checked >= _replica_check_interval)
+
+
 class ForSkipLocked(For):
     def __str__(self):
         assert not self.nowait, "Can not use both NO WAIT and SKIP LOCKED"
@@ -189,6 +415,7 @@ class Database(DatabaseInterface):
     _lock = RLock()
     _databases = defaultdict(dict)
     _connpool = None
+    _replicas = ()
     _list_cache = {}
     _list_cache_timestamp = {}
     _search_path = None
@@ -221,15 +448,17 @@ class Database(DatabaseInterface):
             for database in list(databases.values()):
                 if ((now - database._last_use).total_seconds() > _timeout
                         and database.name != name
-                        and not database._connpool._used):
+                        and not any(p._used for p in database._connpools)):
                     database.close()
             if name in databases:
                 inst = databases[name]
             else:
                 inst = DatabaseInterface.__new__(cls, name=name)
                 try:
-                    inst._connpool = ThreadedConnectionPool(
-                        _minconn, _maxconn, **cls._connection_params(name),
+                    inst._connpool = ConnectionPool(
+                        _minconn, _maxconn, lifetime=_conn_lifetime,
+                        idle_timeout=_conn_idle_timeout,
+                        **cls._connection_params(name),
                         cursor_factory=LoggingCursor)
                 except Exception:
                     logger.error(
@@ -237,6 +466,18 @@ class Database(DatabaseInterface):
                     raise
                 else:
                     logger.info('connection to "%s" succeeded', name)
+                # Replica connections are opened on demand
+                # so an unavailable replica falls back to the primary
+                inst._replicas = [
+                    Replica(ConnectionPool(
+                            0, _maxconn, lifetime=_conn_lifetime,
+                            idle_timeout=_conn_idle_timeout,
+                            **cls._connection_params(name, uri),
+                            connect_timeout=_replica_connect_timeout,
+                            cursor_factory=LoggingCursor))
+                    for uri in _replica_uris]
+                inst._replica_counter = itertools.count()
+                inst._replica_connections = {}
                 databases[name] = inst
             inst._last_use = datetime.now()
             return inst
@@ -244,9 +485,13 @@ class Database(DatabaseInterface):
     def __init__(self, name=_default_name):
         super(Database, self).__init__(name)
 
+    @property
+    def _connpools(self):
+        return [self._connpool, *(r.connpool for r in self._replicas)]
+
     @classmethod
-    def _connection_params(cls, name):
-        uri = parse_uri(config.get('database', 'uri'))
+    def _connection_params(cls, name, uri=None):
+        uri = parse_uri(uri or config.get('database', 'uri'))
         if uri.path and uri.path != '/':
             warnings.warn("The path specified in the URI will be overridden")
         params = {
@@ -261,11 +506,18 @@ class Database(DatabaseInterface):
 
     def get_connection(
             self, autocommit=False, readonly=False, statement_timeout=None):
+        if readonly and not autocommit and self._replicas:
+            conn = self._get_replica_connection(statement_timeout)
+            if conn:
+                return conn
         retry = max(config.getint('database', 'retry'), _maxconn)
         for count in range(retry, -1, -1):
             try:
-                conn = self._connpool.getconn()
-            except (PoolError, DatabaseOperationalError):
+                conn = self._connpool.getconn(timeout=_pool_timeout)
+            except PoolError:
+                logger.warning('no connection available for "%s"', self.name)
+                raise
+            except DatabaseOperationalError:
                 if count and not self._connpool.closed:
                     logger.info('waiting a connection')
                     time.sleep(1)
@@ -293,17 +545,102 @@ class Database(DatabaseInterface):
             break
         return conn
 
+    def _get_replica_connection(self, statement_timeout=None):
+        replicas = self._replicas
+        offset = next(self._replica_counter)
+        for i in range(len(replicas)):
+            replica = replicas[(offset + i) % len(replicas)]
+            if not replica.available:
+                continue
+            connpool = replica.connpool
+            for count in range(_maxconn, -1, -1):
+                try:
+                    conn = connpool.getconn(timeout=0)
+                except PoolError:
+                    conn = None
+                    break
+                except Exception:
+                    logger.warning(
+                        'connection to replica of "%s" failed', self.name,
+                        exc_info=True)
+                    replica.set_unavailable(_replica_retry_interval)
+                    conn = None
+                    break
+                try:
+                    lag = self._check_replica_connection(
+                        replica, conn, statement_timeout)
+                except DatabaseOperationalError:
+                    # The idle connection may have been closed by the server
+                    connpool.putconn(conn, close=True)
+                    conn = None
+                    if not count:
+                        logger.warning(
+                            'connection to replica of "%s" failed',
+                            self.name, exc_info=True)
+                        replica.set_unavailable(_replica_retry_interval)
+                    continue
+                break
+            if conn is None:
+                continue
+            if lag is not None and lag > _replica_max_lag:
+                logger.info(
+                    'replica of "%s" lagging of %ss', self.name, lag)
+                conn.rollback()
+                connpool.putconn(conn)
+                replica.set_unavailable(_replica_check_interval)
+                continue
+            self._replica_connections[id(conn)] = connpool
+            return conn
+
+    def _check_replica_connection(self, replica, conn, statement_timeout):
+        "Set up the replica connection and return its lag if checked"
+        lag = None
+        conn.set_session(
+            isolation_level=ISOLATION_LEVEL_REPEATABLE_READ,
+            readonly=True,
+            autocommit=False)
+        with conn.cursor() as cur:
+            if statement_timeout:
+                cur.execute('SET statement_timeout=%s' %
+                    (statement_timeout * 1000))
+            if replica.check_needed:
+                cur.execute(
+                    'SELECT CASE '
+                    'WHEN pg_last_wal_receive_lsn() '
+                    '= pg_last_wal_replay_lsn() THEN 0 '
+                    'ELSE EXTRACT(EPOCH FROM '
+                    'NOW() - pg_last_xact_replay_timestamp()) END')
+                lag, = cur.fetchone()
+                replica.checked = time.monotonic()
+            elif not statement_timeout:
+                # Detect disconnection
+                cur.execute('SELECT 1')
+        return lag
+
     def put_connection(self, connection, close=False):
         try:
             connection.reset()
         except InterfaceError:
             pass
-        self._connpool.putconn(connection, close=close)
+        connpool = self._replica_connections.pop(
+            id(connection), self._connpool)
+        connpool.putconn(connection, close=close)
+
+    @classmethod
+    def stats(cls):
+        for name, database in cls._databases[os.getpid()].items():
+            for replica, connpool in enumerate(database._connpools):
+                yield {
+                    'name': name,
+                    'replica': replica,
+                    **connpool.stats(),
+                    }
 
     def close(self):
         with self._lock:
             logger.info('disconnection from "%s"', self.name)
-            self._connpool.closeall()
+            for connpool in self._connpools:
+                connpool.closeall()
             self._databases[os.getpid()].pop(self.name)
 
     @classmethod
@@ -466,6 +803,15 @@ class Database(DatabaseInterface):
             cursor.execute(*from_item.select(Count(Literal('*'))))
         return cursor.fetchone()[0]
 
+    def estimated_query_count(self, connection, query):
+        cursor = connection.cursor()
+        query, params = tuple(query)
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + query, params)
+        plan, = cursor.fetchone()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
     def lock(self, connection, table):
         cursor = connection.cursor()
         cursor.execute(SQL('LOCK {} IN EXCLUSIVE MODE NOWAIT').format(
@@ -25,6 +25,7 @@ def register():
         sequence.SequenceType,
         sequence.Sequence,
         sequence.SequenceStrict,
+        sequence.SequenceStrictReservation,
         ui.menu.UIMenu,
         ui.menu.UIMenuFavorite,
         ui.view.View,
@@ -96,6 +96,7 @@ class Cron(DeactivableMixin, ModelSQL, ModelView):
             ('ir.queue|clean', "Clean Task Queue"),
             ('ir.error|clean', "Clean Errors"),
             ('ir.cron.log|clean', "Clean Cron Logs"),
+            ('ir.model|clean_history', "Clean History"),
             ], "Method", required=True, states=_states)
 
     logs = fields.One2Many('ir.cron.log', 'cron', "Logs", readonly=True)
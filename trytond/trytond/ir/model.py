@@ -1,5 +1,6 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
+import datetime as dt
 import heapq
 import json
 import logging
@@ -33,6 +34,7 @@ from .resource import ResourceAccessMixin
 
 logger = logging.getLogger(__name__)
 _request_timeout = config.getint('request', 'timeout', default=0)
+history_clean_days = config.getint('history', 'clean_days', default=None)
 
 
 class ConditionError(ValidationError):
@@ -223,6 +225,19 @@ class Model(
     def get_name(cls, model):
         return cls.get_names().get(model, model)
 
+    @classmethod
+    def clean_history(cls, date=None):
+        "Compact the history of all the models before date"
+        pool = Pool()
+        if date is None:
+            if history_clean_days is None:
+                return
+            date = (
+                dt.datetime.now() - dt.timedelta(days=history_clean_days))
+        for _, Model in pool.iterobject():
+            if issubclass(Model, ModelSQL) and Model._history:
+                Model.compact_history(date)
+
 
 class ModelField(
         fields.fmany2one(
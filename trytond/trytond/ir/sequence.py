@@ -3,7 +3,11 @@
 import time
 from string import Template
 
+from sql import Cast, Null, Select
+from sql.functions import CurrentTimestamp, Function
+
 from trytond import backend
+from trytond.config import config
 from trytond.exceptions import UserError
 from trytond.i18n import gettext
 from trytond.model import Check, DeactivableMixin, ModelSQL, ModelView, fields
@@ -13,6 +17,23 @@ from trytond.pyson import And, Eval
 from trytond.transaction import Transaction, without_check_access
 
 sql_sequence = backend.Database.has_sequence()
+_strict_reservation = config.getboolean(
+    'database', 'strict_sequence_reservation', default=False)
+
+
+class _TxidCurrent(Function):
+    __slots__ = ()
+    _function = 'TXID_CURRENT'
+
+
+class _TxidCurrentIfAssigned(Function):
+    __slots__ = ()
+    _function = 'TXID_CURRENT_IF_ASSIGNED'
+
+
+class _TxidStatus(Function):
+    __slots__ = ()
+    _function = 'TXID_STATUS'
 
 
 class AffixError(ValidationError):
@@ -460,4 +481,130 @@ class SequenceStrict(Sequence):
     _strict = True
 
     def get_many(self, n=1, _lock=True):
-        yield from super().get_many(n=n, _lock=True)
+        yield from super().get_many(n=n, _lock=not self._reserve)
+
+    @property
+    def _reserve(self):
+        return (_strict_reservation
+            and backend.name == 'postgresql'
+            and self.type == 'incremental')
+
+    def _get_many(self, n=1):
+        pool = Pool()
+        Reservation = pool.get('ir.sequence.strict.reservation')
+        # A sub-transaction would wait forever for the row of the sequence if
+        # it is already written by the current transaction
+        if not self._reserve or Reservation.written(self):
+            yield from super()._get_many(n=n)
+            return
+        numbers = Reservation.reuse(self, n)
+        if len(numbers) < n:
+            numbers += Reservation.reserve(self, n - len(numbers))
+        for number in numbers:
+            yield f'{number:0>{self.padding}d}'
+
+
+class SequenceStrictReservation(ModelSQL):
+    "Sequence Strict Reservation"
+    __name__ = 'ir.sequence.strict.reservation'
+
+    sequence = fields.Many2One(
+        'ir.sequence.strict', "Sequence", required=True, ondelete='CASCADE')
+    number = fields.Integer("Number", required=True)
+    transaction = fields.Char("Transaction", required=True)
+
+    @classmethod
+    def __setup__(cls):
+        super().__setup__()
+        cls.__access__.add('sequence')
+        cls._order.insert(0, ('number', 'ASC'))
+
+    @classmethod
+    def _status(cls, table):
+        return _TxidStatus(Cast(table.transaction, 'BIGINT'))
+
+    @classmethod
+    def written(cls, sequence):
+        "Test if the row of the sequence is written by the current transaction"
+        pool = Pool()
+        Sequence = pool.get('ir.sequence.strict')
+        cursor = Transaction().connection.cursor()
+        table = Sequence.__table__()
+
+        def xid(column):
+            return Cast(Cast(column, 'TEXT'), 'BIGINT')
+        # xmin and xmax store the 32-bit transaction id
+        current = _TxidCurrentIfAssigned() % (2 ** 32)
+        cursor.execute(*table.select(table.id,
+                where=(table.id == sequence.id)
+                & ((xid(table.xmin) == current)
+                    | (xid(table.xmax) == current))))
+        return bool(cursor.fetchone())
+
+    @classmethod
+    def reuse(cls, sequence, n):
+        "Return at most n numbers of the sequence from aborted transactions"
+        transaction = Transaction()
+        database = transaction.database
+        cursor = transaction.connection.cursor()
+        table = cls.__table__()
+        reservation = cls.__table__()
+        status = cls._status(reservation)
+        cursor.execute(*table.update(
+                [table.transaction],
+                [Cast(_TxidCurrent(), 'VARCHAR')],
+                where=table.id.in_(reservation.select(
+                        reservation.id,
+                        where=(reservation.sequence == sequence.id)
+                        & (status == 'aborted'),
+                        order_by=[reservation.number.asc],
+                        limit=n,
+                        for_=database.get_select_for_skip_locked()(
+                            'UPDATE'))),
+                returning=[table.number]))
+        return sorted(n for n, in cursor)
+
+    @classmethod
+    def reserve(cls, sequence, n):
+        "Return n new numbers of the sequence committed in a sub-transaction"
+        pool = Pool()
+        Sequence = pool.get('ir.sequence.strict')
+        transaction = Transaction()
+        cursor = transaction.connection.cursor()
+        table = cls.__table__()
+        sequence_table = Sequence.__table__()
+
+        cursor.execute(*Select([_TxidCurrent()]))
+        txid, = cursor.fetchone()
+
+        with transaction.new_transaction() as sub_transaction:
+            cursor = sub_transaction.connection.cursor()
+            # The row of the sequence is locked only until the commit of the
+            # sub-transaction
+            increment = sequence.number_increment
+            cursor.execute(*sequence_table.update(
+                    [sequence_table.number_next_internal],
+                    [sequence_table.number_next_internal + n * increment],
+                    where=sequence_table.id == sequence.id,
+                    returning=[sequence_table.number_next_internal]))
+            end, = cursor.fetchone()
+            numbers = list(range(end - n * increment, end, increment))
+            # The status is unknown for transactions too old so their numbers
+            # can not be reused safely
+            status = cls._status(table)
+            cursor.execute(*table.delete(
+                    where=(table.sequence == sequence.id)
+                    & ((status == 'committed') | (status == Null))))
+            values = [
+                [sequence.id, number, str(txid), sub_transaction.user,
+                    CurrentTimestamp()]
+                for number in numbers]
+            cursor.execute(*table.insert(
+                    [table.sequence, table.number, table.transaction,
+                        table.create_uid, table.create_date],
+                    values))
+
+        # clean cache
+        transaction.counter += 1
+        sequence._local_cache.pop(sequence.id, None)
+        return numbers
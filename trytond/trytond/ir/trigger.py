@@ -2,6 +2,9 @@
 # this repository contains the full copyright notices and license terms.
 import datetime
 import time
+from collections import defaultdict
+from decimal import Decimal
+from threading import Lock
 
 from sql import Literal, Select
 from sql.aggregate import Count, Max
@@ -15,9 +18,90 @@ from trytond.model import (
     fields)
 from trytond.model.exceptions import ValidationError
 from trytond.pool import Pool
-from trytond.pyson import Eval, PYSONDecoder, TimeDelta
+from trytond.pyson import (
+    PYSON, And, Equal, Eval, Get, In, Not, Or, PYSONDecoder, TimeDelta)
 from trytond.tools import grouped_slice, reduce_ids
-from trytond.transaction import Transaction
+from trytond.transaction import (
+    Transaction, inactive_records, without_check_access)
+
+_stats = defaultdict(lambda: {'records': 0, 'time': 0})
+_stats_lock = Lock()
+# The types of value which compare the same in Python and in SQL
+_domain_types = {
+    'char': str,
+    'text': str,
+    'selection': str,
+    'integer': int,
+    'biginteger': int,
+    'float': (int, float),
+    'numeric': (int, Decimal),
+    'many2one': int,
+    }
+
+
+def stats():
+    "Yield the number of records evaluated and the time spent per model"
+    with _stats_lock:
+        values = [{'model': m, **v} for m, v in _stats.items()]
+    yield from values
+
+
+def _statement_field(Model, statement):
+    "Return the field name of Eval('self').get(name) or None"
+    if (isinstance(statement, Get)
+            and isinstance(statement._obj, Eval)
+            and statement._obj._value == 'self'
+            and isinstance(statement._key, str)):
+        field = Model._fields.get(statement._key)
+        if (field
+                and field._type in _domain_types
+                and not isinstance(field, fields.Function)
+                and not getattr(field, 'translate', False)):
+            return statement._key
+
+
+def _is_value(Model, name, value):
+    "Test if the value can be compared to the field in SQL"
+    type_ = _domain_types[Model._fields[name]._type]
+    return (value is None
+        or (isinstance(value, type_) and not isinstance(value, bool)))
+
+
+def _condition_domain(Model, statement):
+    "Return the domain equivalent to the PYSON statement or None"
+    if statement is True:
+        return []
+    elif isinstance(statement, And):
+        domains = [_condition_domain(Model, s) for s in statement._statements]
+        if any(d is None for d in domains):
+            return None
+        if isinstance(statement, Or):
+            return ['OR', *domains]
+        return domains
+    elif isinstance(statement, Equal):
+        for field, value in [
+                (statement._statement1, statement._statement2),
+                (statement._statement2, statement._statement1)]:
+            name = _statement_field(Model, field)
+            if name and _is_value(Model, name, value):
+                return [(name, '=', value)]
+    elif isinstance(statement, In):
+        name = _statement_field(Model, statement._key)
+        if (name and isinstance(statement._obj, list)
+                and all(_is_value(Model, name, v) for v in statement._obj)):
+            return [(name, 'in', statement._obj)]
+    elif isinstance(statement, Not):
+        domain = _condition_domain(Model, statement._value)
+        if domain and len(domain) == 1 and isinstance(domain[0], tuple):
+            (name, operator, value), = domain
+            operator = {'=': '!=', 'in': 'not in'}[operator]
+            domain = [(name, operator, value)]
+            # SQL comparison with NULL is never true
+            if value is not None and (
+                    operator != 'not in' or None not in value):
+                domain = ['OR', domain, (name, '=', None)]
+            return domain
+    return None
 
 
 class ConditionError(ValidationError):
@@ -60,6 +144,8 @@ class Trigger(DeactivableMixin, ModelSQL, ModelView):
         'empty for no delay.')
     action = fields.Selection([], "Action", required=True)
     _get_triggers_cache = Cache('ir_trigger.get_triggers')
+    _condition_domain_cache = Cache(
+        'ir_trigger.condition_domain', context=False)
 
     @classmethod
     def __setup__(cls):
@@ -179,9 +265,55 @@ class Trigger(DeactivableMixin, ModelSQL, ModelView):
         env['self'] = EvalEnvironment(record, record.__class__)
         return bool(PYSONDecoder(env).decode(self.condition))
 
+    def condition_domain(self, Model):
+        "Return the domain equivalent to the condition or None"
+        key = (Model.__name__, self.condition)
+        # The domain is wrapped to cache also None
+        cached = self._condition_domain_cache.get(key)
+        if cached is None:
+            domain = None
+            statement = PYSONDecoder(noeval=True).decode(self.condition)
+            if isinstance(statement, PYSON) or statement is True:
+                domain = _condition_domain(Model, statement)
+            cached = [domain]
+            self._condition_domain_cache.set(key, cached)
+        domain, = cached
+        return domain
+
+    def filter(self, records):
+        '''
+        Return the records for which the condition is true
+        '''
+        if not records:
+            return []
+        start = time.perf_counter()
+        Model = records[0].__class__
+        domain = None
+        if issubclass(Model, ModelSQL):
+            domain = self.condition_domain(Model)
+        if domain is None:
+            result = [r for r in records if self.eval(r)]
+        elif not domain:
+            result = list(records)
+        else:
+            ids = set()
+            with without_check_access(), inactive_records():
+                for sub_records in grouped_slice(records):
+                    ids.update(map(int, Model.search([
+                                    ('id', 'in', [r.id for r in sub_records]),
+                                    domain,
+                                    ], order=[])))
+            result = [r for r in records if r.id in ids]
+        duration = time.perf_counter() - start
+        with _stats_lock:
+            model_stats = _stats[Model.__name__]
+            model_stats['records'] += len(records)
+            model_stats['time'] += duration
+        return result
+
     def queue_trigger_action(self, records):
         trigger_records = Transaction().trigger_records[self.id]
-        ids = {r.id for r in records if self.eval(r)} - trigger_records
+        ids = {r.id for r in self.filter(records)} - trigger_records
         if ids:
             self.__class__.__queue__.trigger_action(self, list(ids))
             trigger_records.update(ids)
@@ -198,7 +330,7 @@ class Trigger(DeactivableMixin, ModelSQL, ModelView):
         cursor = Transaction().connection.cursor()
         trigger_log = TriggerLog.__table__()
 
-        ids = [r.id for r in Model.browse(ids) if self.eval(r)]
+        ids = [r.id for r in self.filter(Model.browse(ids))]
 
         # Filter on limit_number
         if self.limit_number:
@@ -9,8 +9,9 @@ from sql import (
     Asc, Column, Desc, Expression, For, Literal, Null, NullsFirst, NullsLast,
     Table, Union, Window, With)
 from sql.aggregate import Count, Max
-from sql.conditionals import Coalesce
-from sql.functions import CurrentTimestamp, Extract, RowNumber, Substring
+from sql.conditionals import Case, Coalesce
+from sql.functions import (
+    CharLength, CurrentTimestamp, Extract, RowNumber, Substring)
 from sql.operators import And, Concat, Equal, Exists, Operator, Or
 
 from trytond import backend
@@ -33,6 +34,15 @@ from .modelstorage import (
     ValidationError, is_leaf)
 from .modelview import ModelView
 
+COUNT_ESTIMATE_THRESHOLD = config.getint(
+    'database', 'count_estimate_threshold', default=10000)
+# The minimal number of records to validate in SQL instead of Python
+_VALIDATE_SQL_THRESHOLD = 100
+_VALIDATE_SQL_TYPES = {
+    'char', 'text', 'selection', 'integer', 'biginteger', 'float', 'numeric',
+    'date', 'datetime', 'timestamp', 'time', 'timedelta', 'many2one',
+    }
+
 
 class ForeignKeyError(ValidationError):
     pass
@@ -342,7 +352,12 @@ class ModelSQL(ModelStorage):
             cls._history_sql_indexes.update({
                     Index(
                         history_table,
-                        (history_table.id, Index.Equality())),
+                        (history_table.id, Index.Range()),
+                        (Coalesce(
+                                history_table.write_date,
+                                history_table.create_date).desc,
+                            Index.Range()),
+                        include=[Column(history_table, '__id')]),
                     Index(
                         history_table,
                         (Coalesce(
@@ -800,6 +815,35 @@ class ModelSQL(ModelStorage):
         if to_update:
             cls._insert_history(to_update)
 
+    @classmethod
+    def compact_history(cls, datetime):
+        "Remove the revisions which are not needed to read after datetime"
+        if not cls._history:
+            return
+        cursor = Transaction().connection.cursor()
+        history = cls.__table_history__()
+        revision = cls.__table_history__()
+        newer = cls.__table_history__()
+
+        def column_datetime(table):
+            return Coalesce(table.write_date, table.create_date)
+
+        # Keep the last revision before datetime of each record
+        newer_datetime = column_datetime(newer)
+        revision_datetime = column_datetime(revision)
+        superseded = revision.select(
+            Column(revision, '__id'),
+            where=(revision_datetime < datetime)
+            & Exists(newer.select(Literal(1),
+                    where=(newer.id == revision.id)
+                    & (newer_datetime < datetime)
+                    & ((newer_datetime > revision_datetime)
+                        | ((newer_datetime == revision_datetime)
+                            & (Column(newer, '__id')
+                                > Column(revision, '__id')))))))
+        cursor.execute(*history.delete(
+                where=Column(history, '__id').in_(superseded)))
+
     @classmethod
     def restore_history(cls, ids, datetime):
         'Restore record ids from history at the date time'
@@ -1908,6 +1952,31 @@ class ModelSQL(ModelStorage):
 
         return cls.browse([x['id'] for x in rows])
 
+    @classmethod
+    def search_count(cls, domain, offset=0, limit=None, estimate=False):
+        pool = Pool()
+        Rule = pool.get('ir.rule')
+        transaction = Transaction()
+        if not estimate:
+            return super().search_count(
+                domain, offset=offset, limit=limit, estimate=estimate)
+
+        if (not cls._search_domain_active(
+                    domain, active_test=transaction.active_records)
+                and not (cls._history and transaction.context.get('_datetime'))
+                and not Rule.domain_get(cls.__name__, mode='read')):
+            # Check access as search would do
+            super(ModelSQL, cls).search(domain, count=True)
+            count = cls.estimated_count()
+        else:
+            query = cls.search(domain, order=[], query=True)
+            count = transaction.database.estimated_query_count(
+                transaction.connection, query)
+        if count is not None and count > COUNT_ESTIMATE_THRESHOLD:
+            return max(count - offset, 0), False
+        return super().search_count(
+            domain, offset=offset, limit=limit, estimate=estimate)
+
     @classmethod
     def search_domain(cls, domain, active_test=None, tables=None):
         '''
@@ -2087,7 +2156,8 @@ class ModelSQL(ModelStorage):
         # and _update_tree update half of the rows on average.
         # With n = len(ids) and C = cls.estimated_count(), the costs are:
         # - _update_tree: n (2 + 2 * n / 2) -> 2n (1 + n / 2)
-        # - _rebuild_tree: 2 * C
+        # - _rebuild_tree: C as it selects all the rows and updates only the
+        #   moved rows in batch
         for field_name, ids in zip(field_names, list_ids):
             field = cls._fields[field_name]
             if (values is not None
@@ -2096,7 +2166,7 @@ class ModelSQL(ModelStorage):
                     'You can not update fields: "%s", "%s"' %
                     (field.left, field.right))
 
-            if len(ids) * (1 + len(ids) / 2) < cls.estimated_count():
+            if 2 * len(ids) * (1 + len(ids) / 2) < cls.estimated_count():
                 for id_ in ids:
                     cls._update_tree(id_, field_name,
                         field.left, field.right)
@@ -2108,23 +2178,50 @@ class ModelSQL(ModelStorage):
         '''
         Rebuild left, right value for the tree.
         '''
-        cursor = Transaction().connection.cursor()
+        transaction = Transaction()
+        cursor = transaction.connection.cursor()
         table = cls.__table__()
-        right = left + 1
-
-        cursor.execute(*table.select(table.id,
-                where=Column(table, parent) == parent_id))
-        for child_id, in cursor:
-            right = cls._rebuild_tree(parent, child_id, right)
-
         field = cls._fields[parent]
-
-        if parent_id:
+        left_column = Column(table, field.left)
+        right_column = Column(table, field.right)
+
+        children, current = defaultdict(list), {}
+        cursor.execute(*table.select(
+                table.id, Column(table, parent), left_column, right_column,
+                order_by=table.id.asc))
+        for id_, parent_id_, left_, right_ in cursor:
+            children[parent_id_].append(id_)
+            current[id_] = (left_, right_)
+
+        # Walk the tree depth-first without recursion
+        values = {}
+        position = left + 1
+        stack = [(parent_id, left, iter(children[parent_id]))]
+        while stack:
+            node, node_left, node_children = stack[-1]
+            child = next(node_children, None)
+            if child is not None:
+                stack.append((child, position, iter(children[child])))
+                position += 1
+            else:
+                stack.pop()
+                values[node] = (node_left, position)
+                position += 1
+        values.pop(None, None)
+
+        # Update only the nodes which have moved
+        to_update = [
+            (id_, left_, right_) for id_, (left_, right_) in values.items()
+            if current.get(id_) != (left_, right_)]
+        for sub_update in grouped_slice(
+                to_update, transaction.database.IN_MAX // 4):
+            sub_update = list(sub_update)
             cursor.execute(*table.update(
-                    [Column(table, field.left), Column(table, field.right)],
-                    [left, right],
-                    where=table.id == parent_id))
-        return right + 1
+                    [left_column, right_column],
+                    [Case(*((table.id == i, l) for i, l, _ in sub_update)),
+                        Case(*((table.id == i, r) for i, _, r in sub_update))],
+                    where=reduce_ids(table.id, [i for i, _, _ in sub_update])))
+        return position
 
     @classmethod
     def _update_tree(cls, record_id, field_name, left, right):
@@ -2185,6 +2282,45 @@ class ModelSQL(ModelStorage):
                 [left + left_delta, right + right_delta],
                 where=(left >= left_cond) & (right <= right_cond)))
 
+    @classmethod
+    def _validate_sql(cls, records, field_names):
+        validated = super()._validate_sql(records, field_names)
+        # An extra query is slower than testing a few records in Python
+        if (callable(cls.table_query)
+                or len(records) < _VALIDATE_SQL_THRESHOLD):
+            return validated
+        table = cls.__table__()
+        names, conditions = [], []
+        for field_name in field_names:
+            field = cls._fields[field_name]
+            if (field._type not in _VALIDATE_SQL_TYPES
+                    or getattr(field, 'translate', False)):
+                continue
+            size = getattr(field, 'size', None)
+            if size is not None and not isinstance(size, int):
+                continue
+            column = field.sql_column(table)
+            if field.required:
+                if field._type in {'char', 'text', 'selection'}:
+                    conditions.append((column == Null) | (column == ''))
+                else:
+                    conditions.append(column == Null)
+                names.append(field_name)
+            if size is not None and size >= 0:
+                conditions.append(CharLength(column) > size)
+                names.append(field_name)
+        if not conditions:
+            return validated
+        cursor = Transaction().connection.cursor()
+        for sub_ids in grouped_slice(list(map(int, records))):
+            cursor.execute(*table.select(table.id,
+                    where=reduce_ids(table.id, sub_ids) & Or(conditions),
+                    limit=1))
+            if cursor.fetchone():
+                # Let the validation in Python raise the error
+                return validated
+        return validated | set(names)
+
     @classmethod
     def validate(cls, records):
         super(ModelSQL, cls).validate(records)
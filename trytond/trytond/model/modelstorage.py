@@ -5,6 +5,7 @@ import base64
 import csv
 import datetime
 import decimal
+import logging
 import random
 import time
 import warnings
@@ -33,6 +34,8 @@ from . import fields
 from .descriptors import dualmethod
 from .model import Model
 
+logger = logging.getLogger(__name__)
+
 __all__ = ['ModelStorage', 'EvalEnvironment']
 _cache_field = config.getint('cache', 'field')
 _cache_count_timeout = config.getint(
@@ -299,10 +302,8 @@ class ModelStorage(Model):
             return {}
         eligibles = {}
         for trigger in triggers:
-            eligibles[trigger] = []
-            for record in records:
-                if not Trigger.eval(trigger, record):
-                    eligibles[trigger].append(record)
+            triggered = set(trigger.filter(records))
+            eligibles[trigger] = [r for r in records if r not in triggered]
         return eligibles
 
     @classmethod
@@ -582,14 +583,18 @@ class ModelStorage(Model):
         return []
 
     @classmethod
-    def search_count(cls, domain, offset=0, limit=None):
+    def search_count(cls, domain, offset=0, limit=None, estimate=False):
         '''
         Return the number of records that match the domain.
+        If estimate is set, return a tuple with the number and a boolean
+        telling if it is exact.
         '''
         res = cls.search(
             domain, order=[], count=True, offset=offset, limit=limit)
         if isinstance(res, list):
-            return len(res)
+            res = len(res)
+        if estimate:
+            return res, True
         return res
 
     @classmethod
@@ -1189,6 +1194,11 @@ class ModelStorage(Model):
     def validate_fields(cls, records, field_names):
         pass
 
+    @classmethod
+    def _validate_sql(cls, records, field_names):
+        "Return the names of fields which values are required and sized"
+        return set()
+
     @classmethod
     @without_check_access
     def _validate(cls, records, field_names=None):
@@ -1242,9 +1252,12 @@ class ModelStorage(Model):
                 pyson_domain = encoder.encode(field.domain)
                 pyson_context = encoder.encode(field.context)
                 dict_domain = False
-                for record in records:
-                    domain = _record_eval_pyson(
-                        record, pyson_domain, encoded=True)
+                for record, domain, context in zip(
+                        records,
+                        _records_eval_pyson(
+                            records, pyson_domain, encoded=True),
+                        _records_eval_pyson(
+                            records, pyson_context, encoded=True)):
                     if isinstance(domain, dict):
                         dict_domain = True
                         relation = get_relation(record)
@@ -1253,8 +1266,7 @@ class ModelStorage(Model):
                         else:
                             domain = []
                     domain = freeze(domain)
-                    context = freeze(_record_eval_pyson(
-                            record, pyson_context, encoded=True))
+                    context = freeze(context)
                     domains[context][domain].append(record)
                 # Select strategy depending if it is closer to one domain per
                 # record or one domain for all records
@@ -1391,15 +1403,19 @@ class ModelStorage(Model):
             field_names = set(field_names)
         function_fields = {name for name, field in cls._fields.items()
             if isinstance(field, fields.Function)}
+        to_validate = [
+            (field_name, field) for field_name, field in cls._fields.items()
+            if not isinstance(field, fields.Function)
+            and (field_name in field_names
+                or field.validation_depends & field_names
+                or field.validation_depends & function_fields)]
+        sql_validated = cls._validate_sql(
+            records, [n for n, _ in to_validate])
+        debug = logger.isEnabledFor(logging.DEBUG)
         with inactive_records():
-            for field_name, field in cls._fields.items():
-                if (field_name not in field_names
-                        and not (field.validation_depends & field_names)
-                        and not (field.validation_depends & function_fields)):
-                    continue
-                if isinstance(field, fields.Function):
-                    continue
-
+            for field_name, field in to_validate:
+                if debug:
+                    start = time.perf_counter()
                 validate_domain(field)
 
                 def required_test(record, field):
@@ -1418,9 +1434,10 @@ class ModelStorage(Model):
                     if is_pyson(field.states['required']):
                         pyson_required = PYSONEncoder().encode(
                                 field.states['required'])
-                        for record in records:
-                            required = _record_eval_pyson(
-                                record, pyson_required, encoded=True)
+                        for record, required in zip(
+                                records,
+                                _records_eval_pyson(
+                                    records, pyson_required, encoded=True)):
                             if required:
                                 required_test(record, field)
                     else:
@@ -1428,16 +1445,17 @@ class ModelStorage(Model):
                             for record in records:
                                 required_test(record, field)
                 # validate required
-                if field.required:
+                if field.required and field_name not in sql_validated:
                     for record in records:
                         required_test(record, field)
                 # validate size
-                if hasattr(field, 'size') and field.size is not None:
-                    for record in records:
-                        if isinstance(field.size, PYSON):
-                            field_size = _record_eval_pyson(record, field.size)
-                        else:
-                            field_size = field.size
+                if (hasattr(field, 'size') and field.size is not None
+                        and field_name not in sql_validated):
+                    if isinstance(field.size, PYSON):
+                        field_sizes = _records_eval_pyson(records, field.size)
+                    else:
+                        field_sizes = [field.size] * len(records)
+                    for record, field_size in zip(records, field_sizes):
                         size = len(getattr(record, field_name) or '')
                         if field_size is not None and (size > field_size >= 0):
                             error_args = cls.__names__(field_name, record)
@@ -1476,9 +1494,10 @@ class ModelStorage(Model):
                 if getattr(field, 'digits', None):
                     if is_pyson(field.digits):
                         pyson_digits = PYSONEncoder().encode(field.digits)
-                        for record in records:
-                            digits = _record_eval_pyson(
-                                record, pyson_digits, encoded=True)
+                        for record, digits in zip(
+                                records,
+                                _records_eval_pyson(
+                                    records, pyson_digits, encoded=True)):
                             digits_test(record, digits, field_name)
                     else:
                         for record in records:
@@ -1564,6 +1583,11 @@ class ModelStorage(Model):
                     else:
                         for record in records:
                             format_test(record, field.format, field_name)
+                if debug:
+                    logger.debug(
+                        "validate %s.%s of %s records in %.6fs",
+                        cls.__name__, field_name, len(records),
+                        time.perf_counter() - start)
 
         for record in records:
             record.pre_validate()
@@ -2073,16 +2097,24 @@ class EvalEnvironment(dict):
 
 
 def _record_eval_pyson(record, source, encoded=False):
+    return _records_eval_pyson([record], source, encoded=encoded)[0]
+
+
+def _records_eval_pyson(records, source, encoded=False):
     transaction = Transaction()
     if not encoded:
         pyson = _pyson_encoder.encode(source)
     else:
         pyson = source
-    env = EvalEnvironment(record, record.__class__)
-    env['context'] = transaction.context
-    env['active_model'] = record.__class__.__name__
-    env['active_id'] = record.id
-    return PYSONDecoder(env).decode(pyson)
+    evaluate = PYSONDecoder.compile(pyson)
+    result = []
+    for record in records:
+        env = EvalEnvironment(record, record.__class__)
+        env['context'] = transaction.context
+        env['active_model'] = record.__class__.__name__
+        env['active_id'] = record.id
+        result.append(evaluate(env))
+    return result
 
 
 _pyson_encoder = PYSONEncoder()
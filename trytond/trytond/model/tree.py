@@ -2,8 +2,11 @@
 # this repository contains the full copyright notices and license terms.
 from itertools import chain
 
+from sql import Column, With
+
 from trytond.i18n import gettext
-from trytond.tools import escape_wildcard
+from trytond.tools import escape_wildcard, grouped_slice, reduce_ids
+from trytond.transaction import Transaction
 
 from .modelstorage import ValidationError
 
@@ -14,6 +17,7 @@ class RecursionError(ValidationError):
 
 def tree(parent='parent', name='name', separator=None):
     from . import fields
+    from .modelsql import ModelSQL
 
     class TreeMixin(object):
         __slots__ = ()
@@ -112,6 +116,15 @@ def tree(parent='parent', name='name', separator=None):
                     'Unsupported field type "%s" for field "%s" on "%s"'
                     % (parent_type, parent, cls.__name__))
 
+            field = cls._fields[parent]
+            if (parent_type == 'many2one'
+                    and field.model_name == cls.__name__
+                    and not isinstance(field, fields.Function)
+                    and issubclass(cls, ModelSQL)
+                    and not callable(cls.table_query)):
+                cls._check_recursion_sql(records)
+                return
+
             visited = set()
 
             for record in records:
@@ -145,6 +158,38 @@ def tree(parent='parent', name='name', separator=None):
                             and getattr(walker, parent))
                 visited.update(walked)
 
+        @classmethod
+        def _check_recursion_sql(cls, records):
+            "Check recursion by fetching all the ancestors in one query"
+            table = cls.__table__()
+            cursor = Transaction().connection.cursor()
+            column = Column(table, parent)
+            for sub_records in grouped_slice(records):
+                sub_records = list(sub_records)
+                ancestors = With('id', 'parent', recursive=True)
+                ancestors.query = table.select(
+                    table.id, column,
+                    where=reduce_ids(table.id, map(int, sub_records)))
+                ancestors.query |= (table
+                    .join(ancestors, condition=table.id == ancestors.parent)
+                    .select(table.id, column))
+                cursor.execute(*ancestors.select(
+                        ancestors.id, ancestors.parent, with_=[ancestors]))
+                parents = dict(cursor)
+                for record in sub_records:
+                    walked = set()
+                    walker = parents.get(record.id)
+                    while walker and walker not in walked:
+                        if walker == record.id:
+                            parent_name = getattr(
+                                getattr(record, parent), name)
+                            raise RecursionError(
+                                gettext('ir.msg_recursion_error',
+                                    rec_name=getattr(record, name),
+                                    parent_rec_name=parent_name))
+                        walked.add(walker)
+                        walker = parents.get(walker)
+
     return TreeMixin
 
 
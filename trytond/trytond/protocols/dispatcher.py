@@ -10,16 +10,16 @@ from sql import Table
 from trytond import __version__, backend, security
 from trytond.config import config, get_hostname
 from trytond.exceptions import (
-    ConcurrencyException, LoginException, RateLimitException, UserError,
-    UserWarning)
+    ConcurrencyException, LoginException, RateLimitException, TrytonException,
+    UserError, UserWarning)
 from trytond.rpc import RPCReturnException
 from trytond.tools import is_instance_method
-from trytond.tools.logging import format_args
+from trytond.tools.logging import format_args, format_exception
 from trytond.transaction import Transaction, TransactionError
 from trytond.worker import run_task
 from trytond.wsgi import app
 
-from .wrappers import HTTPStatus, Response, abort, with_pool
+from .wrappers import HTTPStatus, Response, abort, exceptions, with_pool
 
 __all__ = ['register_authentication_service']
 
@@ -40,6 +40,7 @@ def rpc(request, database_name):
         'system.listMethods': list_method,
         'system.methodHelp': help_method,
         'system.methodSignature': lambda *a: 'signatures not supported',
+        'system.multicall': multicall,
         }
     return methods.get(request.rpc_method, _dispatch)(
         request, database_name, *request.rpc_params)
@@ -148,8 +149,9 @@ def list_method(request, pool):
     return methods
 
 
-def get_object_method(request, pool):
-    method = request.rpc_method
+def get_object_method(request, pool, method=None):
+    if method is None:
+        method = request.rpc_method
     type, _ = method.split('.', 1)
     name = '.'.join(method.split('.')[1:-1])
     method = method.split('.')[-1]
@@ -166,7 +168,57 @@ def help_method(request, pool):
 @app.auth_required
 @with_pool
 def _dispatch(request, pool, *args, **kwargs):
-    obj, method = get_object_method(request, pool)
+    rpc, result = _execute(request, pool, None, args, kwargs)
+    _reset_session(request, pool)
+    response = app.make_response(request, result)
+    if rpc.readonly and rpc.cache:
+        data = getattr(response, 'serialized_result', None)
+        if data is not None:
+            etag = rpc.cache.etag(data)
+            if request.if_none_match.contains_weak(etag):
+                not_modified = Response(status=HTTPStatus.NOT_MODIFIED)
+                not_modified.vary.update(response.vary)
+                response = not_modified
+            response.set_etag(etag)
+        response.headers.extend(rpc.cache.headers())
+    return response
+
+
+@app.auth_required
+@with_pool
+def multicall(request, pool, calls):
+    "Execute sequentially the calls and return their results"
+    results = []
+    for call in calls:
+        try:
+            _, result = _execute(
+                request, pool, call['methodName'], call['params'], {})
+        except exceptions.HTTPException as e:
+            results.append({
+                    'faultCode': e.code,
+                    'faultString': e.description,
+                    'error': (e.name, e.description),
+                    })
+        except TrytonException as e:
+            results.append({
+                    'faultCode': getattr(e, 'code', 255),
+                    'faultString': str(e),
+                    'error': e.args,
+                    })
+        except Exception as e:
+            results.append({
+                    'faultCode': 255,
+                    'faultString': str(e),
+                    'error': (str(e), format_exception(e)),
+                    })
+        else:
+            results.append([result])
+    _reset_session(request, pool)
+    return results
+
+
+def _execute(request, pool, method, args, kwargs):
+    obj, method = get_object_method(request, pool, method)
     if method in obj.__rpc__:
         rpc = obj.__rpc__[method]
     else:
@@ -228,7 +280,8 @@ def _dispatch(request, pool, *args, **kwargs):
                 e.fix(transaction_extras)
                 continue
             except backend.DatabaseTimeoutError:
-                logger.warning(log_message, *log_args, exc_info=True)
+                logger.warning(
+                    log_message, *log_args, duration(), exc_info=True)
                 abort(HTTPStatus.REQUEST_TIMEOUT)
             except backend.DatabaseOperationalError:
                 if count < retry and not rpc.readonly:
@@ -257,12 +310,15 @@ def _dispatch(request, pool, *args, **kwargs):
         while transaction.tasks:
             task_id = transaction.tasks.pop()
             run_task(pool, task_id)
-        if session:
-            context = {'_request': request.context}
-            security.reset(pool.database_name, session, context=context)
         logger.info(log_message, *log_args, duration())
         logger.debug('Result: %r', result)
-        response = app.make_response(request, result)
-        if rpc.readonly and rpc.cache:
-            response.headers.extend(rpc.cache.headers())
-        return response
+        return rpc, result
+
+
+def _reset_session(request, pool):
+    session = None
+    if request.authorization.type == 'session':
+        session = request.authorization.get('session')
+    if session:
+        context = {'_request': request.context}
+        security.reset(pool.database_name, session, context=context)
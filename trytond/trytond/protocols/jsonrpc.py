@@ -2,7 +2,6 @@
 # this repository contains the full copyright notices and license terms.
 import base64
 import datetime
-import gzip
 import json
 from decimal import Decimal
 
@@ -14,9 +13,14 @@ from werkzeug.wrappers import Response
 from trytond.exceptions import (
     ConcurrencyException, LoginException, MissingDependenciesException,
     RateLimitException, TrytonException, UserWarning)
-from trytond.protocols.wrappers import Request
+from trytond.protocols.wrappers import Request, compress
 from trytond.tools import cached_property
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class JSONDecoder(object):
 
@@ -28,8 +32,9 @@ class JSONDecoder(object):
         cls.decoders[klass] = decoder
 
     def __call__(self, dct):
-        if dct.get('__class__') in self.decoders:
-            return self.decoders[dct['__class__']](dct)
+        decoder = self.decoders.get(dct.get('__class__'))
+        if decoder:
+            return decoder(dct)
         return dct
 
 
@@ -118,6 +123,44 @@ JSONEncoder.register(Decimal,
         })
 
 
+def _orjson_default(obj):
+    # orjson serializes natively the JSON types
+    # so only the registered classes are dispatched here
+    try:
+        marshaller = JSONEncoder.serializers[type(obj)]
+    except KeyError:
+        raise TypeError(
+            "Object of type %s is not JSON serializable" % type(obj).__name__)
+    return marshaller(obj)
+
+
+def dumps(obj):
+    "Return the JSON representation of obj as UTF-8 bytes"
+    if orjson:
+        try:
+            return orjson.dumps(
+                obj, default=_orjson_default,
+                option=(orjson.OPT_PASSTHROUGH_DATETIME
+                    | orjson.OPT_NON_STR_KEYS))
+        except orjson.JSONEncodeError:
+            # e.g. integer larger than 64-bit
+            pass
+    return json.dumps(
+        obj, cls=JSONEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data, encoding='utf-8', errors='strict'):
+    "Return the object from the JSON bytes data"
+    # Without encoded classes, there is no object hook to call
+    if orjson and b'"__class__"' not in data:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(
+        data.decode(encoding, errors), object_hook=JSONDecoder())
+
+
 class JSONRequest(Request):
     parsed_content_type = 'json'
 
@@ -125,11 +168,10 @@ class JSONRequest(Request):
     def parsed_data(self):
         if self.parsed_content_type in self.environ.get('CONTENT_TYPE', ''):
             try:
-                return json.loads(
-                    self.decoded_data.decode(
-                        getattr(self, 'charset', 'utf-8'),
-                        getattr(self, 'encoding_errors', 'replace')),
-                    object_hook=JSONDecoder())
+                return loads(
+                    self.decoded_data,
+                    getattr(self, 'charset', 'utf-8'),
+                    getattr(self, 'encoding_errors', 'replace'))
             except HTTPException:
                 raise
             except Exception:
@@ -159,16 +201,22 @@ class JSONProtocol:
             parsed_data = request.parsed_data
         except BadRequest:
             parsed_data = {}
+        result = None
         if (isinstance(request, JSONRequest)
                 and set(parsed_data.keys()) == {'id', 'method', 'params'}):
-            response = {'id': parsed_data.get('id', 0)}
+            id_ = parsed_data.get('id', 0)
             if isinstance(data, TrytonException):
-                response['error'] = data.args
+                body = dumps({'id': id_, 'error': data.args})
             elif isinstance(data, Exception):
                 # report exception back to server
-                response['error'] = (str(data), data.__format_traceback__)
+                body = dumps({
+                        'id': id_,
+                        'error': (str(data), data.__format_traceback__),
+                        })
             else:
-                response['result'] = data
+                # Serialize the result apart to compute its ETag
+                result = dumps(data)
+                body = b'{"id":%s,"result":%s}' % (dumps(id_), result)
         else:
             if isinstance(data, UserWarning):
                 return Conflict(data)
@@ -184,12 +232,10 @@ class JSONProtocol:
                 return BadRequest(data)
             elif isinstance(data, Exception):
                 return InternalServerError(data)
-            response = data
+            body = result = dumps(data)
         headers = {}
-        data = json.dumps(
-            response, cls=JSONEncoder, separators=(',', ':'))
-        if len(data) >= 1400 and 'gzip' in request.accept_encodings:
-            data = gzip.compress(data.encode('utf-8'), compresslevel=1)
-            headers['Content-Encoding'] = 'gzip'
-        return Response(
-            data, content_type='application/json', headers=headers)
+        response = Response(
+            compress(request, body, headers),
+            content_type='application/json', headers=headers)
+        response.serialized_result = result
+        return response
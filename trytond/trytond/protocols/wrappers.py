@@ -4,13 +4,21 @@ import base64
 import gzip
 import logging
 import time
-from functools import wraps
+from functools import partial, wraps
 
 try:
     from http import HTTPStatus
 except ImportError:
     from http import client as HTTPStatus
 
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
 from werkzeug import exceptions
 from werkzeug.datastructures import Authorization
 from werkzeug.exceptions import abort
@@ -31,6 +39,7 @@ __all__ = [
     'Response',
     'abort',
     'allow_null_origin',
+    'compress',
     'exceptions',
     'redirect',
     'send_file',
@@ -175,6 +184,28 @@ def parse_session(token):
             })
 
 
+# Ordered by preference
+COMPRESSIONS = {}
+if zstandard:
+    COMPRESSIONS['zstd'] = lambda data: (
+        zstandard.ZstdCompressor(level=1).compress(data))
+if brotli:
+    COMPRESSIONS['br'] = partial(brotli.compress, quality=1)
+COMPRESSIONS['gzip'] = partial(gzip.compress, compresslevel=1, mtime=0)
+
+
+def compress(request, data, headers):
+    "Return data compressed with the best encoding accepted by the request"
+    headers['Vary'] = 'Accept-Encoding'
+    if len(data) < config.getint('request', 'compress_threshold'):
+        return data
+    encoding = request.accept_encodings.best_match(COMPRESSIONS)
+    if encoding:
+        data = COMPRESSIONS[encoding](data)
+        headers['Content-Encoding'] = encoding
+    return data
+
+
 def set_max_request_size(size):
     def decorator(func):
         func.max_request_size = size
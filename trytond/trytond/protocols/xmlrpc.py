@@ -1,7 +1,6 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 import datetime
-import gzip
 import logging
 import xmlrpc.client as client
 # convert decimal to float before marshalling:
@@ -17,7 +16,7 @@ from trytond.exceptions import (
     ConcurrencyException, LoginException, MissingDependenciesException,
     RateLimitException, TrytonException, UserWarning)
 from trytond.model.fields.dict import ImmutableDict
-from trytond.protocols.wrappers import Request
+from trytond.protocols.wrappers import Request, compress
 from trytond.tools import cached_property
 
 logger = logging.getLogger(__name__)
@@ -170,13 +169,14 @@ class XMLProtocol:
             else:
                 data = (data,)
             headers = {}
-            data = client.dumps(
-                data, methodresponse=True, allow_none=True)
-            if len(data) >= 1400 and 'gzip' in request.accept_encodings:
-                data = gzip.compress(data.encode('utf-8'), compresslevel=1)
-                headers['Content-Encoding'] = 'gzip'
-            return Response(
-                data, content_type='text/xml', headers=headers)
+            body = client.dumps(
+                data, methodresponse=True, allow_none=True).encode('utf-8')
+            response = Response(
+                compress(request, body, headers),
+                content_type='text/xml', headers=headers)
+            if isinstance(data, tuple):
+                response.serialized_result = body
+            return response
         else:
             if isinstance(data, UserWarning):
                 return Conflict(data)
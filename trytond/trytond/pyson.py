@@ -3,7 +3,7 @@
 import datetime
 import json
 from decimal import Decimal
-from functools import reduce
+from functools import lru_cache, reduce
 
 from dateutil.relativedelta import relativedelta
 
@@ -138,6 +138,42 @@ class PYSONDecoder(json.JSONDecoder):
                     return klass(**dct)
         return dct
 
+    def decode(self, s, *args, **kwargs):
+        if self.noeval or args or kwargs:
+            return super().decode(s, *args, **kwargs)
+        return self.compile(s)(self.__context)
+
+    @staticmethod
+    def compile(s):
+        "Return a function which evaluates the string with a context"
+        return _compile(s)
+
+
+@lru_cache(maxsize=1024)
+def _compile(s):
+    return _compile_object(json.loads(s))
+
+
+def _compile_object(obj):
+    if isinstance(obj, dict):
+        items = [(k, _compile_object(v)) for k, v in obj.items()]
+        klass = CONTEXT.get(obj['__class__']) if '__class__' in obj else None
+
+        def evaluate(context):
+            dct = {k: v(context) for k, v in items}
+            if klass:
+                return klass.eval(dct, context)
+            return dct
+    elif isinstance(obj, list):
+        values = [_compile_object(v) for v in obj]
+
+        def evaluate(context):
+            return [v(context) for v in values]
+    else:
+        def evaluate(context):
+            return obj
+    return evaluate
+
 
 class Eval(PYSON):
 
@@ -1,7 +1,9 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 import datetime
+import http.client
 import inspect
+import itertools
 import logging
 import math
 import operator
@@ -13,6 +15,7 @@ import tempfile
 import time
 import unicodedata
 import warnings
+import xmlrpc.client
 import zipfile
 from email.message import EmailMessage
 from io import BytesIO
@@ -33,6 +36,7 @@ except ImportError:
 from genshi.filters import Translator
 from genshi.template.text import TextTemplate
 
+from trytond.cache import Cache, freeze
 from trytond.config import config
 from trytond.i18n import gettext
 from trytond.model.exceptions import AccessError
@@ -119,6 +123,24 @@ CONVERT_COMMAND = config.get(
     '--convert-to "%(output_extension)s" '
     '--outdir "%(directory)s" '
     '"%(input_path)s"')
+CONVERT_SERVERS = list(filter(None,
+        config.get('report', 'convert_servers', default='').splitlines()))
+_convert_servers_counter = itertools.count()
+CACHE_DURATION = config.getint('report', 'cache_duration', default=0)
+_execute_cache = Cache(
+    'report.execute', duration=CACHE_DURATION or None, context=False)
+
+
+class _ConvertTransport(xmlrpc.client.Transport):
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        connection = super().make_connection(host)
+        connection.timeout = self.timeout
+        return connection
 
 
 class TranslateFactory:
@@ -257,7 +279,7 @@ class Report(URLMixin, PoolBase):
             with zipfile.ZipFile(content, 'w') as content_zip:
                 for i, (header, group_records) in enumerate(
                         zip(headers, groups), 1):
-                    oext, rcontent = cls._execute(
+                    oext, rcontent = cls._execute_cached(
                         group_records, header, data, action_report)
                     number = str(i).zfill(padding)
                     filename = report_name(
@@ -268,7 +290,7 @@ class Report(URLMixin, PoolBase):
             content = content.getvalue()
             oext = 'zip'
         else:
-            oext, content = cls._execute(
+            oext, content = cls._execute_cached(
                 groups[0], headers[0], data, action_report)
         if not isinstance(content, str):
             content = bytearray(content) if bytes == str else bytes(content)
@@ -291,6 +313,43 @@ class Report(URLMixin, PoolBase):
             report_context = cls.get_context(records, header, data)
             return cls.convert(action, cls.render(action, report_context))
 
+    @classmethod
+    def _execute_cached(cls, records, header, data, action):
+        # Only committed records have a reliable write date
+        if not CACHE_DURATION or not Transaction().readonly:
+            return cls._execute(records, header, data, action)
+        key = cls._execute_cache_key(records, header, data, action)
+        if key is None:
+            return cls._execute(records, header, data, action)
+        result = _execute_cache.get(key)
+        if result is None:
+            result = cls._execute(records, header, data, action)
+            _execute_cache.set(key, result)
+        return result
+
+    @classmethod
+    def _execute_cache_key(cls, records, header, data, action):
+        "Return the key to cache the output of _execute or None"
+        if not records:
+            return None
+        timestamps = []
+        for record in records:
+            timestamp = (getattr(record, 'write_date', None)
+                or getattr(record, 'create_date', None))
+            if timestamp is None:
+                return None
+            timestamps.append((record.id, timestamp))
+        transaction = Transaction()
+        # The rendered data depend on the access rules of the user, on the
+        # language and on the context like the company
+        context = {
+            k: v for k, v in transaction.context.items()
+            if k not in Cache.context_ignored_keys}
+        return (
+            cls.__name__, action.id, action.write_date, transaction.user,
+            transaction.language, freeze(context),
+            freeze(header), freeze(data), tuple(timestamps))
+
     @classmethod
     def _get_records(cls, ids, model, data):
         pool = Pool()
@@ -410,9 +469,15 @@ class Report(URLMixin, PoolBase):
         if input_format == output_format and output_format in MIMETYPES:
             return output_format, data
 
-        directory = tempfile.mkdtemp(prefix='trytond_')
         input_extension = FORMAT2EXT.get(input_format, input_format)
         output_extension = FORMAT2EXT.get(output_format, output_format)
+        if CONVERT_SERVERS:
+            content = cls._convert_server(
+                report, data, output_extension, timeout=timeout)
+            if content is not None:
+                return output_extension, content
+
+        directory = tempfile.mkdtemp(prefix='trytond_')
         path = pathlib.Path(directory, report.report_name)
         input_path = path.with_suffix(os.extsep + input_extension)
         output_path = path.with_suffix(os.extsep + output_extension)
@@ -455,6 +520,27 @@ class Report(URLMixin, PoolBase):
             except OSError:
                 pass
 
+    @classmethod
+    def _convert_server(cls, report, data, output_extension, timeout=None):
+        "converts the report data using the running conversion servers"
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        offset = next(_convert_servers_counter)
+        for i in range(len(CONVERT_SERVERS)):
+            url = CONVERT_SERVERS[(offset + i) % len(CONVERT_SERVERS)]
+            server = xmlrpc.client.ServerProxy(
+                url, transport=_ConvertTransport(timeout), allow_none=True)
+            try:
+                result = server.convert(
+                    None, xmlrpc.client.Binary(data), None, output_extension)
+            except (OSError, http.client.HTTPException,
+                    xmlrpc.client.Error):
+                logger.warning(
+                    "fail to convert %s to %s with %s",
+                    report.report_name, output_extension, url, exc_info=True)
+                continue
+            return result.data
+
     @classmethod
     def format_date(cls, value, lang=None, format=None):
         pool = Pool()
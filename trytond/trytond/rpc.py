@@ -2,6 +2,7 @@
 # this repository contains the full copyright notices and license terms.
 import copy
 import datetime as dt
+import hashlib
 
 from trytond.exceptions import TrytonException
 from trytond.transaction import Transaction
@@ -106,6 +107,10 @@ class RPCCache:
             'X-Tryton-Cache': int(self.duration.total_seconds()),
             }
 
+    def etag(self, data):
+        "Return the entity tag of the serialized result"
+        return hashlib.sha1(data).hexdigest()
+
 
 class RPCReturnException(TrytonException):
     "Exception to return response instead of being raised"
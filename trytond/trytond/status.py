@@ -34,7 +34,9 @@ def processing(request):
 
 
 def log():
+    from trytond import backend
     from trytond.cache import Cache
+    from trytond.ir import trigger
     msg = []
     now = time.perf_counter()
     for process in sorted(status.copy().values(), key=lambda p: p.start_time):
@@ -46,6 +48,8 @@ def log():
         'id': '%s@%s' % (os.getpid(), platform.node()),
         'status': msg,
         'caches': list(Cache.stats()),
+        'databases': list(backend.Database.stats()),
+        'triggers': list(trigger.stats()),
         }
 
 
@@ -0,0 +1,242 @@
+# This file is part of Tryton.  The COPYRIGHT file at the top level of this
+# repository contains the full copyright notices and license terms.
+
+import base64
+import gzip
+import json
+import unittest
+from unittest.mock import patch
+
+from trytond import backend
+from trytond.pool import Pool
+from trytond.protocols.wrappers import Response, brotli, zstandard
+from trytond.tests.test_tryton import (
+    DB_NAME, Client, TestCase, activate_module, drop_db)
+from trytond.transaction import Transaction
+from trytond.wsgi import app
+
+
+class DispatcherTestCase(TestCase):
+    "Test Dispatcher"
+
+    @classmethod
+    def setUpClass(cls):
+        drop_db()
+        activate_module(['ir', 'res'])
+        pool = Pool(DB_NAME)
+        with Transaction().start(DB_NAME, 0):
+            User = pool.get('res.user')
+            admin, = User.search([('login', '=', 'admin')])
+            admin.password = 'password'
+            admin.save()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        drop_db()
+
+    @property
+    def url(self):
+        return '/%s/' % DB_NAME
+
+    def headers(self, **headers):
+        headers['Authorization'] = (
+            'Basic ' + base64.b64encode(b'admin:password').decode())
+        return headers
+
+    def rpc(self, method, *params, id_=1, **headers):
+        c = Client(app, Response)
+        return c.post(
+            self.url, headers=self.headers(**headers),
+            content_type='application/json',
+            data=json.dumps({
+                    'id': id_,
+                    'method': method,
+                    'params': list(params),
+                    }))
+
+    def test_cache_etag(self):
+        "Test cacheable method returns ETag"
+        response = self.rpc('model.res.user.fields_get', [], {})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers.get('ETag'))
+        self.assertTrue(response.headers.get('X-Tryton-Cache'))
+
+    def test_cache_not_modified(self):
+        "Test cacheable method returns not modified"
+        response = self.rpc('model.res.user.fields_get', [], {})
+        etag = response.headers['ETag']
+
+        response = self.rpc(
+            'model.res.user.fields_get', [], {}, **{'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertTrue(response.headers.get('X-Tryton-Cache'))
+
+    def test_cache_not_modified_other_id(self):
+        "Test ETag does not depend on the request id"
+        response = self.rpc('model.res.user.fields_get', [], {})
+        etag = response.headers['ETag']
+
+        response = self.rpc(
+            'model.res.user.fields_get', [], {}, id_=2,
+            **{'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_cache_not_modified_vary(self):
+        "Test not modified response varies on encoding"
+        response = self.rpc('model.res.user.fields_get', [], {})
+        etag = response.headers['ETag']
+
+        response = self.rpc(
+            'model.res.user.fields_get', [], {}, **{'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Accept-Encoding', response.vary)
+
+    def test_cache_modified(self):
+        "Test cacheable method with other ETag"
+        response = self.rpc(
+            'model.res.user.fields_get', [], {}, **{'If-None-Match': '"foo"'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['id'], 1)
+
+    def test_no_cache_etag(self):
+        "Test non cacheable method does not return ETag"
+        response = self.rpc('model.res.user.search', [], {})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.headers.get('ETag'))
+
+    def test_compress(self):
+        "Test compressed response"
+        response = self.rpc(
+            'model.res.user.fields_get', [], {},
+            **{'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            json.loads(gzip.decompress(response.data))['id'], 1)
+
+    def test_no_compress(self):
+        "Test not compressed response"
+        response = self.rpc(
+            'model.res.user.fields_get', [], {},
+            **{'Accept-Encoding': 'identity'})
+
+        self.assertIsNone(response.headers.get('Content-Encoding'))
+        self.assertEqual(json.loads(response.data)['id'], 1)
+
+    def test_no_compress_vary(self):
+        "Test small response varies on encoding"
+        response = self.rpc(
+            'model.res.user.search_count', [], {},
+            **{'Accept-Encoding': 'gzip'})
+
+        self.assertIsNone(response.headers.get('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response.vary)
+
+    @unittest.skipIf(brotli is None, "Brotli is missing")
+    def test_compress_brotli(self):
+        "Test Brotli compressed response"
+        response = self.rpc(
+            'model.res.user.fields_get', [], {},
+            **{'Accept-Encoding': 'gzip, br'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'br')
+        self.assertEqual(
+            json.loads(brotli.decompress(response.data))['id'], 1)
+
+    @unittest.skipIf(zstandard is None, "zstandard is missing")
+    def test_compress_zstd(self):
+        "Test zstd compressed response"
+        response = self.rpc(
+            'model.res.user.fields_get', [], {},
+            **{'Accept-Encoding': 'gzip, br, zstd'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'zstd')
+        self.assertEqual(
+            json.loads(
+                zstandard.ZstdDecompressor().decompress(response.data))['id'],
+            1)
+
+    def test_multicall(self):
+        "Test multicall"
+        response = self.rpc('system.multicall', [{
+                    'methodName': 'model.res.user.search_count',
+                    'params': [[('login', '=', 'admin')], {}],
+                    }, {
+                    'methodName': 'model.res.user.search',
+                    'params': [[('login', '=', 'foo')], {}],
+                    }])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['result'], [[1], [[]]])
+
+    def test_multicall_error(self):
+        "Test multicall with error"
+        response = self.rpc('system.multicall', [{
+                    'methodName': 'model.res.user.create',
+                    'params': [[{}], {}],
+                    }, {
+                    'methodName': 'model.res.user.search_count',
+                    'params': [[('login', '=', 'admin')], {}],
+                    }])
+
+        fault, result = json.loads(response.data)['result']
+        self.assertEqual(fault['faultCode'], 1)
+        self.assertEqual(fault['error'][0], 'UserError')
+        self.assertEqual(result, [1])
+
+    def test_multicall_forbidden(self):
+        "Test multicall with forbidden method"
+        response = self.rpc('system.multicall', [{
+                    'methodName': 'model.res.user.__setup__',
+                    'params': [{}],
+                    }, {
+                    'methodName': 'model.res.user.search_count',
+                    'params': [[('login', '=', 'admin')], {}],
+                    }])
+
+        self.assertEqual(response.status_code, 200)
+        fault, result = json.loads(response.data)['result']
+        self.assertEqual(fault['faultCode'], 403)
+        self.assertEqual(fault['error'][0], 'Forbidden')
+        self.assertEqual(result, [1])
+
+    def test_multicall_timeout(self):
+        "Test multicall with timeout"
+        pool = Pool(DB_NAME)
+        User = pool.get('res.user')
+        with patch.object(
+                User, 'search_count',
+                side_effect=backend.DatabaseTimeoutError), \
+                self.assertLogs('trytond.protocols.dispatcher', 'WARNING'):
+            response = self.rpc('system.multicall', [{
+                        'methodName': 'model.res.user.search',
+                        'params': [[('login', '=', 'admin')], {}],
+                        }, {
+                        'methodName': 'model.res.user.search_count',
+                        'params': [[], {}],
+                        }])
+
+        self.assertEqual(response.status_code, 200)
+        result, fault = json.loads(response.data)['result']
+        self.assertEqual(result, [[1]])
+        self.assertEqual(fault['faultCode'], 408)
+
+    def test_multicall_unknown(self):
+        "Test multicall with unknown method"
+        response = self.rpc('system.multicall', [{
+                    'methodName': 'model.res.user.foo',
+                    'params': [{}],
+                    }])
+
+        self.assertEqual(response.status_code, 200)
+        fault, = json.loads(response.data)['result']
+        self.assertEqual(fault['faultCode'], 403)
@@ -5,6 +5,7 @@ import unittest
 from unittest.mock import patch
 
 from trytond import backend
+from trytond.ir import model as ir_model_module
 from trytond.model.exceptions import AccessError
 from trytond.pool import Pool
 from trytond.tests.test_tryton import (
@@ -220,6 +221,90 @@ class HistoryTestCase(TestCase):
         history = History(history_id)
         self.assertEqual(history.value, 1)
 
+    @with_transaction()
+    def test_compact_history(self):
+        "Test compact history"
+        pool = Pool()
+        History = pool.get('test.history')
+        transaction = Transaction()
+        cursor = transaction.connection.cursor()
+        history_table = History.__table_history__()
+
+        history = History(value=1)
+        history.save()
+        history_id = history.id
+        first = history.create_date
+
+        transaction.commit()
+
+        history = History(history_id)
+        history.value = 2
+        history.save()
+        second = history.write_date
+
+        transaction.commit()
+
+        history = History(history_id)
+        history.value = 3
+        history.save()
+        third = history.write_date
+
+        transaction.commit()
+
+        History.compact_history(third)
+
+        cursor.execute(*history_table.select(
+                history_table.value,
+                where=history_table.id == history_id,
+                order_by=history_table.value))
+        self.assertEqual([v for v, in cursor], [2, 3])
+        for timestamp, value in [
+                (second, 2),
+                (third, 3),
+                ]:
+            with Transaction().set_context(_datetime=timestamp):
+                history = History(history_id)
+                self.assertEqual(history.value, value)
+        with Transaction().set_context(_datetime=first):
+            self.assertFalse(History.search([('id', '=', history_id)]))
+
+    @with_transaction()
+    def test_clean_history(self):
+        "Test clean history"
+        pool = Pool()
+        History = pool.get('test.history')
+        IrModel = pool.get('ir.model')
+        transaction = Transaction()
+        cursor = transaction.connection.cursor()
+        history_table = History.__table_history__()
+
+        history = History(value=1)
+        history.save()
+        history_id = history.id
+
+        transaction.commit()
+
+        history = History(history_id)
+        history.value = 2
+        history.save()
+
+        transaction.commit()
+
+        def revisions():
+            cursor.execute(*history_table.select(
+                    history_table.value,
+                    where=history_table.id == history_id,
+                    order_by=history_table.value))
+            return [v for v, in cursor]
+
+        with patch.object(ir_model_module, 'history_clean_days', None):
+            IrModel.clean_history()
+        self.assertEqual(revisions(), [1, 2])
+
+        with patch.object(ir_model_module, 'history_clean_days', -1):
+            IrModel.clean_history()
+        self.assertEqual(revisions(), [2])
+
     @unittest.skipUnless(backend.name == 'postgresql',
         'CURRENT_TIMESTAMP as transaction_timestamp is specific to postgresql')
     @with_transaction()
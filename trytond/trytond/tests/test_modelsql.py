@@ -7,8 +7,11 @@ import time
 import unittest
 from unittest.mock import call, patch
 
+from sql import Column
+
 from trytond import backend
 from trytond.exceptions import ConcurrencyException
+from trytond.model import modelsql as modelsql_module
 from trytond.model.exceptions import (
     AccessError, ForeignKeyError, RequiredValidationError, SQLConstraintError)
 from trytond.model.modelsql import split_subquery_domain
@@ -401,6 +404,62 @@ class ModelSQLTestCase(TestCase):
                 self.fail('RequiredValidationError should be caught')
             transaction.rollback()
 
+    @with_transaction()
+    @patch.object(modelsql_module, '_VALIDATE_SQL_THRESHOLD', 1)
+    def test_validate_sql(self):
+        "Test validate required and size in SQL"
+        pool = Pool()
+        Modelsql = pool.get('test.modelsql')
+        CharSize = pool.get('test.char_size')
+        CharSizePYSON = pool.get('test.char_size_pyson')
+
+        record, = Modelsql.create([{'desc': "Foo", 'integer': 0}])
+        sized, = CharSize.create([{'char': "Foo"}])
+        pyson_sized, = CharSizePYSON.create([{'char': "Foo", 'size': 5}])
+
+        self.assertEqual(
+            Modelsql._validate_sql([record], ['desc', 'integer']),
+            {'desc', 'integer'})
+        self.assertEqual(CharSize._validate_sql([sized], ['char']), {'char'})
+        self.assertEqual(
+            CharSizePYSON._validate_sql([pyson_sized], ['char', 'size']),
+            set())
+
+    @with_transaction()
+    def test_validate_sql_threshold(self):
+        "Test validate required and size in SQL below threshold"
+        pool = Pool()
+        Modelsql = pool.get('test.modelsql')
+
+        record, = Modelsql.create([{'desc': "Foo", 'integer': 0}])
+
+        with patch.object(modelsql_module, '_VALIDATE_SQL_THRESHOLD', 2):
+            self.assertEqual(
+                Modelsql._validate_sql([record], ['desc', 'integer']), set())
+
+    @with_transaction()
+    @patch.object(modelsql_module, '_VALIDATE_SQL_THRESHOLD', 1)
+    def test_validate_sql_invalid(self):
+        "Test validate required and size in SQL with invalid values"
+        pool = Pool()
+        Modelsql = pool.get('test.modelsql')
+        CharSize = pool.get('test.char_size')
+        cursor = Transaction().connection.cursor()
+
+        record, = Modelsql.create([{'desc': "Foo", 'integer': 0}])
+        sized, = CharSize.create([{'char': "Foo"}])
+        for Model, column, value in [
+                (Modelsql, 'desc', ''),
+                (CharSize, 'char', "Foo Bar"),
+                ]:
+            table = Model.__table__()
+            cursor.execute(*table.update(
+                    [Column(table, column)], [value]))
+
+        self.assertEqual(
+            Modelsql._validate_sql([record], ['desc', 'integer']), set())
+        self.assertEqual(CharSize._validate_sql([sized], ['char']), set())
+
     @with_transaction()
     def test_check_timestamp(self):
         'Test check timestamp'
@@ -1299,6 +1358,48 @@ class ModelSQLTestCase(TestCase):
         self.assertEqual(Model.search([], offset=5, count=True), 5)
         self.assertEqual(Model.search([], offset=20, count=True), 0)
 
+    @with_transaction()
+    def test_search_count_estimate(self):
+        "Test search count with estimate"
+        pool = Pool()
+        Model = pool.get('test.modelsql.search')
+
+        Model.create([{'name': str(i)} for i in range(10)])
+
+        with patch.object(Model, 'estimated_count') as ec:
+            ec.return_value = 10
+            self.assertEqual(
+                Model.search_count([], estimate=True), (10, True))
+            ec.return_value = 20000
+            self.assertEqual(
+                Model.search_count([], estimate=True), (20000, False))
+            self.assertEqual(
+                Model.search_count([], offset=5, estimate=True),
+                (19995, False))
+            self.assertEqual(
+                Model.search_count([('name', '=', '1')], estimate=True),
+                (1, True))
+
+    @with_transaction()
+    def test_search_count_estimate_query(self):
+        "Test search count with estimate of query"
+        pool = Pool()
+        Model = pool.get('test.modelsql.search')
+        transaction = Transaction()
+
+        Model.create([{'name': str(i)} for i in range(10)])
+
+        with patch.object(
+                transaction.database, 'estimated_query_count') as eqc:
+            eqc.return_value = 20000
+            self.assertEqual(
+                Model.search_count([('name', '!=', '1')], estimate=True),
+                (20000, False))
+            eqc.return_value = None
+            self.assertEqual(
+                Model.search_count([('name', '!=', '1')], estimate=True),
+                (9, True))
+
     def test_split_subquery_domain_empty(self):
         """
         Test the split of domains in local and relation parts (empty domain)
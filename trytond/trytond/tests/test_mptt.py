@@ -7,7 +7,7 @@ from unittest.mock import patch
 from trytond.pool import Pool
 from trytond.tests.test_tryton import (
     TestCase, activate_module, with_transaction)
-from trytond.transaction import inactive_records
+from trytond.transaction import Transaction, inactive_records
 
 from .test_tree import TreeTestCaseMixin
 
@@ -95,3 +95,38 @@ class MPTTTestCase(TreeTestCaseMixin, TestCase):
                                     }])],
                     }])
         self.check_tree()
+
+    @with_transaction()
+    def test_rebuild_reset(self):
+        "Test rebuild with reset left and right"
+        pool = Pool()
+        Mptt = pool.get('test.mptt')
+        table = Mptt.__table__()
+        cursor = Transaction().connection.cursor()
+
+        self.create()
+        cursor.execute(*table.update([table.left, table.right], [0, 0]))
+
+        self.rebuild()
+
+        self.check_tree()
+
+    @with_transaction()
+    def test_rebuild_subtree(self):
+        "Test rebuild of a subtree"
+        pool = Pool()
+        Mptt = pool.get('test.mptt')
+        table = Mptt.__table__()
+        cursor = Transaction().connection.cursor()
+
+        self.create()
+        record, = Mptt.search([('parent', '=', None)], limit=1)
+        left, right = record.left, record.right
+        children = Mptt.search([('parent', 'child_of', [record.id])])
+        cursor.execute(*table.update(
+                [table.left, table.right], [0, 0],
+                where=table.id.in_([c.id for c in children])))
+
+        self.assertEqual(
+            Mptt._rebuild_tree('parent', record.id, left), right + 1)
+        self.check_tree()
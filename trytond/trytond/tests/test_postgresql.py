@@ -0,0 +1,338 @@
+# This file is part of Tryton.  The COPYRIGHT file at the top level of
+# this repository contains the full copyright notices and license terms.
+import itertools
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+try:
+    from psycopg2 import OperationalError
+    from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+    from psycopg2.pool import PoolError
+
+    from trytond.backend.postgresql import database as database_module
+    from trytond.backend.postgresql.database import (
+        ConnectionPool, Database, Replica)
+except ImportError:
+    database_module = None
+
+
+class _Connection:
+    lag = 0
+
+    def __init__(self, **kwargs):
+        self.closed = False
+        self.broken = False
+        self.queries = []
+
+    @property
+    def lag_checks(self):
+        return len([q for q in self.queries if 'pg_last_wal' in q])
+
+    def close(self):
+        self.closed = True
+
+    def get_transaction_status(self):
+        return TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        pass
+
+    def reset(self):
+        pass
+
+    def set_session(self, **kwargs):
+        pass
+
+    def cursor(self):
+        return _Cursor(self)
+
+
+class _Cursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        pass
+
+    def execute(self, query, params=None):
+        if self.connection.broken:
+            raise OperationalError
+        self.connection.queries.append(query)
+
+    def fetchone(self):
+        return (self.connection.lag,)
+
+
+def _wait_until(predicate, timeout=5):
+    end = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < end:
+        time.sleep(0.01)
+    return predicate()
+
+
+@unittest.skipIf(database_module is None, "psycopg2 is missing")
+class ConnectionPoolTestCase(unittest.TestCase):
+    "Test PostgreSQL ConnectionPool"
+
+    def setUp(self):
+        super().setUp()
+        connect = patch.object(
+            database_module, 'connect', side_effect=_Connection)
+        self.connect = connect.start()
+        self.addCleanup(connect.stop)
+
+    def create_pool(self, minconn=0, maxconn=2, idle_timeout=60, **kwargs):
+        pool = ConnectionPool(
+            minconn, maxconn, idle_timeout=idle_timeout, **kwargs)
+
+        def close():
+            if not pool.closed:
+                pool.closeall()
+        self.addCleanup(close)
+        return pool
+
+    def test_minconn(self):
+        "Test connections opened at creation"
+        pool = self.create_pool(minconn=2)
+
+        self.assertEqual(self.connect.call_count, 2)
+        self.assertEqual(pool.stats()['idle'], 2)
+
+    def test_reuse(self):
+        "Test released connection is reused"
+        pool = self.create_pool()
+
+        conn = pool.getconn()
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(), conn)
+        self.assertEqual(pool.stats()['opened'], 1)
+
+    def test_exhausted(self):
+        "Test timeout when pool is exhausted"
+        pool = self.create_pool(maxconn=1)
+
+        pool.getconn()
+        with self.assertRaises(PoolError):
+            pool.getconn(timeout=0.01)
+
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_wait_released(self):
+        "Test waiting for a released connection"
+        pool = self.create_pool(maxconn=1)
+
+        conn = pool.getconn()
+        timer = threading.Timer(0.05, pool.putconn, args=(conn,))
+        timer.start()
+        self.addCleanup(timer.join)
+
+        self.assertIs(pool.getconn(timeout=5), conn)
+        self.assertEqual(pool.stats()['waits'], 1)
+        self.assertEqual(pool.stats()['timeouts'], 0)
+
+    def test_connect_without_lock(self):
+        "Test slow connection does not block the pool"
+        pool = self.create_pool()
+        conn = pool.getconn()
+        event = threading.Event()
+
+        def connect(**kwargs):
+            event.wait(5)
+            return _Connection()
+        self.connect.side_effect = connect
+        thread = threading.Thread(target=pool.getconn)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.assertTrue(_wait_until(lambda: pool._connecting))
+
+        pool.putconn(conn)
+        self.assertIs(pool.getconn(timeout=0), conn)
+        with self.assertRaises(PoolError):
+            pool.getconn(timeout=0)
+
+        event.set()
+        thread.join()
+        self.assertEqual(pool.stats()['in_use'], 2)
+
+    def test_connect_error(self):
+        "Test failed connection releases its slot"
+        pool = self.create_pool(maxconn=1)
+
+        self.connect.side_effect = OperationalError
+        with self.assertRaises(OperationalError):
+            pool.getconn()
+
+        self.connect.side_effect = _Connection
+        self.assertTrue(pool.getconn(timeout=0))
+
+    def test_recycle(self):
+        "Test connection is recycled after its lifetime"
+        pool = self.create_pool(lifetime=0.01)
+
+        conn = pool.getconn()
+        time.sleep(0.02)
+        pool.putconn(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+        self.assertIsNot(pool.getconn(), conn)
+
+    def test_reap_idle(self):
+        "Test idle connections are closed without activity"
+        pool = self.create_pool(minconn=1, idle_timeout=0.05)
+
+        conn1 = pool.getconn()
+        conn2 = pool.getconn()
+        pool.putconn(conn2)
+        pool.putconn(conn1)
+
+        self.assertTrue(_wait_until(lambda: conn2.closed))
+        self.assertFalse(conn1.closed)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_closeall(self):
+        "Test close all connections"
+        pool = self.create_pool(maxconn=1)
+
+        conn = pool.getconn()
+        errors = []
+
+        def getconn():
+            try:
+                pool.getconn(timeout=5)
+            except PoolError as exception:
+                errors.append(exception)
+        thread = threading.Thread(target=getconn)
+        thread.start()
+        self.assertTrue(_wait_until(lambda: pool.stats()['waits']))
+        pool.closeall()
+        thread.join()
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(len(errors), 1)
+        with self.assertRaises(PoolError):
+            pool.getconn()
+
+
+@unittest.skipIf(database_module is None, "psycopg2 is missing")
+class ReplicaTestCase(unittest.TestCase):
+    "Test PostgreSQL replicas"
+
+    def setUp(self):
+        super().setUp()
+        connect = patch.object(
+            database_module, 'connect', side_effect=_Connection)
+        self.connect = connect.start()
+        self.addCleanup(connect.stop)
+
+    def create_database(self):
+        database = object.__new__(Database)
+        database.name = 'test'
+        database._replicas = [Replica(
+                ConnectionPool(0, 2, idle_timeout=60))]
+        database._replica_counter = itertools.count()
+        database._replica_connections = {}
+        self.addCleanup(database._replicas[0].connpool.closeall)
+        return database
+
+    def test_connect_timeout(self):
+        "Test replica connection has a timeout"
+        with patch.object(database_module, '_replica_uris', ['postgresql://']):
+            database = Database('test_replica')
+            self.addCleanup(database.close)
+
+        replica, = database._replicas
+        self.assertEqual(
+            replica.connpool._kwargs['connect_timeout'],
+            database_module._replica_connect_timeout)
+
+    def test_connection(self):
+        "Test connection to replica"
+        database = self.create_database()
+
+        conn = database._get_replica_connection()
+
+        self.assertTrue(conn)
+        self.assertEqual(conn.lag_checks, 1)
+
+    def test_lag_check_cached(self):
+        "Test lag of replica is not checked at each connection"
+        database = self.create_database()
+
+        conn = database._get_replica_connection()
+        database.put_connection(conn)
+        conn = database._get_replica_connection()
+
+        self.assertEqual(conn.lag_checks, 1)
+        self.assertEqual(conn.queries[-1], 'SELECT 1')
+
+        with patch.object(database_module, '_replica_check_interval', 0):
+            database.put_connection(conn)
+            conn = database._get_replica_connection()
+
+        self.assertEqual(conn.lag_checks, 2)
+
+    def test_broken_idle_connection(self):
+        "Test broken idle connection to replica is replaced"
+        database = self.create_database()
+        replica, = database._replicas
+
+        conn = database._get_replica_connection()
+        database.put_connection(conn)
+        conn.broken = True
+        new_conn = database._get_replica_connection()
+
+        self.assertTrue(new_conn)
+        self.assertIsNot(new_conn, conn)
+        self.assertTrue(conn.closed)
+        self.assertTrue(replica.available)
+
+    def test_lagging(self):
+        "Test lagging replica is not used"
+        database = self.create_database()
+        replica, = database._replicas
+
+        with patch.object(_Connection, 'lag', 10):
+            self.assertIsNone(database._get_replica_connection())
+            self.assertFalse(replica.available)
+
+    def test_unavailable(self):
+        "Test unavailable replica is not retried immediately"
+        database = self.create_database()
+        replica, = database._replicas
+
+        self.connect.side_effect = OperationalError
+        with self.assertLogs(database_module.logger, 'WARNING'):
+            self.assertIsNone(database._get_replica_connection())
+        self.assertIsNone(database._get_replica_connection())
+
+        self.assertEqual(self.connect.call_count, 1)
+        self.assertFalse(replica.available)
+
+        self.connect.side_effect = _Connection
+        replica.unavailable_until = 0
+        self.assertTrue(database._get_replica_connection())
+
+    def test_broken_replica(self):
+        "Test replica with only broken connections is not used"
+        database = self.create_database()
+        replica, = database._replicas
+
+        def connect(**kwargs):
+            conn = _Connection()
+            conn.broken = True
+            return conn
+        self.connect.side_effect = connect
+        with self.assertLogs(database_module.logger, 'WARNING'):
+            self.assertIsNone(database._get_replica_connection())
+
+        self.assertFalse(replica.available)
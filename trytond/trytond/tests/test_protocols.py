@@ -5,7 +5,8 @@ import datetime
 import json
 from decimal import Decimal
 
-from trytond.protocols.jsonrpc import JSONDecoder, JSONEncoder, JSONRequest
+from trytond.protocols.jsonrpc import (
+    JSONDecoder, JSONEncoder, JSONRequest, dumps, loads)
 from trytond.protocols.xmlrpc import XMLRequest, client
 from trytond.tests.test_tryton import TestCase
 from trytond.tools.immutabledict import ImmutableDict
@@ -73,6 +74,35 @@ class JSONTestCase(DumpsLoadsMixin, TestCase):
                 object_hook=JSONDecoder()), value)
 
 
+class JSONDumpsLoadsTestCase(DumpsLoadsMixin, TestCase):
+    "Test JSON dumps and loads"
+
+    def test_compatible(self):
+        "Test dumps is compatible with JSONEncoder"
+        value = {
+            'date': datetime.date(2024, 1, 1),
+            'decimal': Decimal('1.5'),
+            1: [None, True, 'foo'],
+            }
+        self.assertEqual(
+            json.loads(dumps(value), object_hook=JSONDecoder()),
+            json.loads(
+                json.dumps(value, cls=JSONEncoder), object_hook=JSONDecoder()))
+
+    def test_loads_invalid_utf8(self):
+        "Test loads with invalid UTF-8"
+        self.assertEqual(
+            loads(b'"\xff"', errors='replace'), '\ufffd')
+
+    def test_dumps_unknown_type(self):
+        "Test dumps unknown type"
+        with self.assertRaises(TypeError):
+            dumps(object())
+
+    def dumps_loads(self, value):
+        self.assertEqual(loads(dumps(value)), value)
+
+
 class XMLTestCase(DumpsLoadsMixin, TestCase):
     'Test XML'
 
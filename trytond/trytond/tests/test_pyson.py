@@ -968,6 +968,35 @@ class PYSONTestCase(TestCase):
 
         self.assertEqual(pyson.PYSONDecoder(ctx).decode(eval), 1)
 
+    def test_compile(self):
+        "Test PYSONDecoder.compile"
+        encoded = pyson.PYSONEncoder().encode(
+            pyson.If(pyson.Eval('foo', 0) > 1, [pyson.Eval('bar')], []))
+
+        evaluate = pyson.PYSONDecoder.compile(encoded)
+
+        self.assertIs(pyson.PYSONDecoder.compile(encoded), evaluate)
+        self.assertEqual(evaluate({'foo': 2, 'bar': 'test'}), ['test'])
+        self.assertEqual(evaluate({'foo': 1, 'bar': 'test'}), [])
+
+    def test_compile_mutable_result(self):
+        "Test PYSONDecoder.compile returns new objects"
+        encoded = pyson.PYSONEncoder().encode([{'foo': [1]}])
+        evaluate = pyson.PYSONDecoder.compile(encoded)
+
+        result = evaluate({})
+        result[0]['foo'].append(2)
+
+        self.assertEqual(evaluate({}), [{'foo': [1]}])
+
+    def test_decode_noeval(self):
+        "Test PYSONDecoder.decode without evaluation"
+        encoded = pyson.PYSONEncoder().encode(pyson.Eval('foo', 0))
+
+        self.assertEqual(
+            repr(pyson.PYSONDecoder(noeval=True).decode(encoded)),
+            repr(pyson.Eval('foo', 0)))
+
     def test_eval_true(self):
         "Test PYSON.eval JS true"
         self.assertEqual(eval('true', pyson.CONTEXT), True)
@@ -1,12 +1,19 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 import datetime
+import threading
+import xmlrpc.client
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+from xmlrpc.server import SimpleXMLRPCServer
 
 from trytond.model.exceptions import AccessError
 from trytond.pool import Pool
+from trytond.report import report as report_module
 from trytond.report.report import Report
 from trytond.tests.test_tryton import (
     TestCase, activate_module, with_transaction)
+from trytond.transaction import Transaction
 
 
 class ReportTestCase(TestCase):
@@ -83,6 +90,172 @@ class ReportTestCase(TestCase):
         with self.assertRaises(AccessError):
             Report.execute([1], {'model': 'test.access'})
 
+    @with_transaction()
+    def test_execute_cached(self):
+        "Execute report from cache"
+        pool = Pool()
+        Report = pool.get('test.test_report', type='report')
+        Access = pool.get('test.access')
+        transaction = Transaction()
+
+        record = Access(field1="Test")
+        record.save()
+        transaction.commit()
+        execute = Mock(return_value=('txt', 'Test'))
+        with patch.object(report_module, 'CACHE_DURATION', 60), \
+                patch.object(Report, '_execute', execute):
+            with transaction.new_transaction(readonly=True):
+                for _ in range(2):
+                    result = Report.execute(
+                        [record.id], {'model': 'test.access'})
+
+            self.assertEqual(result[:2], ('txt', 'Test'))
+            self.assertEqual(execute.call_count, 1)
+
+            with transaction.new_transaction():
+                Access.write([Access(record.id)], {'field1': "Modified"})
+            with transaction.new_transaction(readonly=True):
+                Report.execute([record.id], {'model': 'test.access'})
+
+            self.assertEqual(execute.call_count, 2)
+
+        with transaction.new_transaction():
+            Access.delete([Access(record.id)])
+
+    @with_transaction()
+    def test_execute_cached_language(self):
+        "Execute report from cache in different languages"
+        pool = Pool()
+        Report = pool.get('test.test_report', type='report')
+        Access = pool.get('test.access')
+        transaction = Transaction()
+
+        record = Access(field1="Test")
+        record.save()
+        transaction.commit()
+
+        def execute(records, header, data, action):
+            return 'txt', Transaction().language
+        with patch.object(report_module, 'CACHE_DURATION', 60), \
+                patch.object(Report, '_execute', side_effect=execute):
+            with transaction.new_transaction(readonly=True):
+                with Transaction().set_context(language='en'):
+                    result_en = Report.execute(
+                        [record.id], {'model': 'test.access'})
+                with Transaction().set_context(language='fr'):
+                    result_fr = Report.execute(
+                        [record.id], {'model': 'test.access'})
+
+        self.assertEqual(result_en[1], 'en')
+        self.assertEqual(result_fr[1], 'fr')
+
+        with transaction.new_transaction():
+            Access.delete([Access(record.id)])
+
+    @with_transaction()
+    def test_execute_cache_key_context(self):
+        "Test execute cache key depends on context"
+        pool = Pool()
+        Report = pool.get('test.test_report', type='report')
+        Access = pool.get('test.access')
+        action = Mock(id=1, write_date=None)
+
+        record = Access(field1="Test")
+        record.save()
+
+        key = Report._execute_cache_key([record], {}, {}, action)
+        with Transaction().set_context(company=1):
+            company_key = Report._execute_cache_key([record], {}, {}, action)
+        with Transaction().set_context(_request={'remote_addr': '::1'}):
+            request_key = Report._execute_cache_key([record], {}, {}, action)
+
+        self.assertNotEqual(key, company_key)
+        self.assertEqual(key, request_key)
+
+    @with_transaction()
+    def test_execute_cache_key_user(self):
+        "Test execute cache key depends on user"
+        pool = Pool()
+        Report = pool.get('test.test_report', type='report')
+        Access = pool.get('test.access')
+        User = pool.get('res.user')
+        action = Mock(id=1, write_date=None)
+
+        record = Access(field1="Test")
+        record.save()
+        user = User(login='test')
+        user.save()
+
+        key = Report._execute_cache_key([record], {}, {}, action)
+        with Transaction().set_user(user.id):
+            user_key = Report._execute_cache_key([record], {}, {}, action)
+
+        self.assertIsNotNone(key)
+        self.assertIsNotNone(user_key)
+        self.assertNotEqual(key, user_key)
+
+    @with_transaction()
+    def test_execute_cache_key_without_timestamp(self):
+        "Test execute cache key of record without timestamp"
+        pool = Pool()
+        Report = pool.get('test.test_report', type='report')
+        action = Mock(id=1, write_date=None)
+
+        self.assertIsNone(Report._execute_cache_key(
+                [SimpleNamespace(id=1)], {}, {}, action))
+
+    @with_transaction()
+    def test_execute_cached_not_readonly(self):
+        "Execute report without cache in read-write transaction"
+        pool = Pool()
+        Report = pool.get('test.test_report', type='report')
+        Access = pool.get('test.access')
+
+        record = Access(field1="Test")
+        record.save()
+        execute = Mock(return_value=('txt', 'Test'))
+        with patch.object(report_module, 'CACHE_DURATION', 60), \
+                patch.object(Report, '_execute', execute):
+            for _ in range(2):
+                Report.execute([record.id], {'model': 'test.access'})
+
+        self.assertEqual(execute.call_count, 2)
+
+
+class ReportConvertServerTestCase(TestCase):
+    "Test Report convert with server"
+
+    def setUp(self):
+        super().setUp()
+        server = SimpleXMLRPCServer(
+            ('localhost', 0), allow_none=True, logRequests=False)
+
+        def convert(inpath, indata, outpath, convert_to, *args):
+            return xmlrpc.client.Binary(
+                indata.data.upper() + convert_to.encode())
+        server.register_function(convert)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.url = 'http://localhost:%s' % server.server_address[1]
+        self.report = Mock(
+            template_extension='odt', extension='pdf', report_name='test')
+
+    def test_convert(self):
+        "Test convert with server"
+        with patch.object(report_module, 'CONVERT_SERVERS', [self.url]):
+            self.assertEqual(
+                Report.convert(self.report, 'foo'), ('pdf', b'FOOpdf'))
+
+    def test_convert_unavailable_server(self):
+        "Test convert with an unavailable server"
+        with patch.object(report_module, 'CONVERT_SERVERS', [
+                    'http://localhost:1', self.url]):
+            for _ in range(2):
+                self.assertEqual(
+                    Report.convert(self.report, b'foo'), ('pdf', b'FOOpdf'))
+
 
 def create_test_format_timedelta(i, in_, out):
     @with_transaction()
@@ -2,7 +2,13 @@
 # This file is part of Tryton.  The COPYRIGHT file at the top level of
 # this repository contains the full copyright notices and license terms.
 import datetime
+import unittest
+from unittest.mock import patch
 
+from sql import Cast, Literal
+
+from trytond import backend
+from trytond.ir import sequence as sequence_module
 from trytond.ir.sequence import LastTimestampError
 from trytond.pool import Pool
 from trytond.tests.test_tryton import (
@@ -158,3 +164,119 @@ class SequenceStrictTestCase(SequenceTestCase):
     def get_model():
         pool = Pool()
         return pool.get('ir.sequence.strict')
+
+
+class SequenceStrictReservationTestCase(TestCase):
+    "Test Sequence Strict with reservation"
+
+    @classmethod
+    def setUpClass(cls):
+        activate_module('tests')
+
+    def setUp(self):
+        super().setUp()
+        reservation = patch.object(
+            sequence_module, '_strict_reservation', True)
+        reservation.start()
+        self.addCleanup(reservation.stop)
+
+    def create_sequence(self):
+        pool = Pool()
+        Sequence = pool.get('ir.sequence.strict')
+        SequenceType = pool.get('ir.sequence.type')
+
+        sequence_type, = SequenceType.search([
+                ('name', '=', "Test"),
+                ], limit=1)
+        sequence, = Sequence.create([{
+                    'name': "Test reservation",
+                    'sequence_type': sequence_type.id,
+                    'type': 'incremental',
+                    }])
+        return sequence
+
+    @with_transaction()
+    def test_written_in_transaction(self):
+        "Test sequence written by the transaction is not reserved"
+        pool = Pool()
+        Sequence = pool.get('ir.sequence.strict')
+        Reservation = pool.get('ir.sequence.strict.reservation')
+
+        sequence = self.create_sequence()
+
+        with patch.object(Sequence, '_reserve', True), \
+                patch.object(Reservation, 'written', return_value=True), \
+                patch.object(Reservation, 'reuse') as reuse, \
+                patch.object(Reservation, 'reserve') as reserve:
+            self.assertEqual(list(sequence.get_many(2)), ['1', '2'])
+            reuse.assert_not_called()
+            reserve.assert_not_called()
+
+    @unittest.skipIf(
+        backend.name != 'postgresql', "Reservation requires PostgreSQL")
+    @with_transaction()
+    def test_written_in_transaction_postgresql(self):
+        "Test sequence written by the transaction does not wait for itself"
+        pool = Pool()
+        Reservation = pool.get('ir.sequence.strict.reservation')
+
+        sequence = self.create_sequence()
+
+        self.assertTrue(Reservation.written(sequence))
+        self.assertEqual(sequence.get(), '1')
+        self.assertEqual(sequence.get(), '2')
+        self.assertFalse(Reservation.search([
+                    ('sequence', '=', sequence.id),
+                    ]))
+
+    @unittest.skipIf(
+        backend.name != 'postgresql', "Reservation requires PostgreSQL")
+    @with_transaction()
+    def test_reuse_rollback(self):
+        "Test reuse number of rollbacked transaction"
+        pool = Pool()
+        Sequence = pool.get('ir.sequence.strict')
+        transaction = Transaction()
+
+        sequence = self.create_sequence()
+        transaction.commit()
+        try:
+            with transaction.new_transaction() as sub_transaction:
+                self.assertEqual(Sequence(sequence.id).get(), '1')
+                sub_transaction.rollback()
+            with transaction.new_transaction():
+                self.assertEqual(
+                    list(Sequence(sequence.id).get_many(2)), ['1', '2'])
+            with transaction.new_transaction():
+                self.assertEqual(Sequence(sequence.id).get(), '3')
+        finally:
+            with transaction.new_transaction():
+                Sequence.delete([Sequence(sequence.id)])
+
+    @unittest.skipIf(
+        backend.name != 'postgresql', "Reservation requires PostgreSQL")
+    @with_transaction()
+    def test_no_reuse_unknown_status(self):
+        "Test number of transaction with unknown status is not reused"
+        pool = Pool()
+        Sequence = pool.get('ir.sequence.strict')
+        Reservation = pool.get('ir.sequence.strict.reservation')
+        transaction = Transaction()
+
+        sequence = self.create_sequence()
+        transaction.commit()
+        try:
+            with transaction.new_transaction():
+                self.assertEqual(Sequence(sequence.id).get(), '1')
+            with transaction.new_transaction(), \
+                    patch.object(Reservation, '_status',
+                        lambda table: Cast(Literal(None), 'VARCHAR')):
+                self.assertEqual(Sequence(sequence.id).get(), '2')
+                self.assertEqual(
+                    [r.number for r in Reservation.search([
+                                ('sequence', '=', sequence.id),
+                                ])],
+                    [2])
+        finally:
+            with transaction.new_transaction():
+                Sequence.delete([Sequence(sequence.id)])
@@ -32,7 +32,7 @@ from trytond.tools.domain_inversion import (
     extract_reference_models, localize_domain, merge, parse,
     prepare_reference_domain, simplify, sort, unique_value)
 from trytond.tools.immutabledict import ImmutableDict
-from trytond.tools.logging import format_args
+from trytond.tools.logging import format_args, format_exception
 from trytond.tools.string_ import LazyString, StringPartitioned
 
 try:
@@ -444,6 +444,19 @@ class ToolsTestCase(TestCase):
                             max_items=5)),
                     long_form)
 
+    def test_format_exception(self):
+        "Test format_exception"
+        try:
+            raise ValueError('foo')
+        except ValueError as e:
+            exception = e
+        with patch.object(sys, 'path', [__file__]):
+            tb_s = format_exception(exception)
+
+        self.assertIn('ValueError: foo', tb_s)
+        self.assertIn('test_format_exception', tb_s)
+        self.assertNotIn(__file__, tb_s)
+
 
 class StringPartitionedTestCase(TestCase):
     "Test StringPartitioned"
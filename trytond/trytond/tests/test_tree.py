@@ -413,6 +413,33 @@ class TreeMixinTestCase(TestCase):
             parent.parent = child
             parent.save()
 
+    @with_transaction()
+    def test_check_recursion_self(self):
+        "Test check_recursion with itself as parent"
+        pool = Pool()
+        Tree = pool.get('test.tree')
+
+        record = Tree(name="record")
+        record.save()
+
+        with self.assertRaises(RecursionError):
+            record.parent = record
+            record.save()
+
+    @with_transaction()
+    def test_check_recursion_many(self):
+        "Test check_recursion writing many records"
+        pool = Pool()
+        Tree = pool.get('test.tree')
+
+        records = Tree.create([{'name': str(i)} for i in range(10)])
+        Tree.write(*sum((
+                    [[r], {'parent': p.id}]
+                    for r, p in zip(records[1:], records)), []))
+
+        with self.assertRaises(RecursionError):
+            Tree.write(records[:1], {'parent': records[-1].id})
+
     @with_transaction()
     def test_check_recursion_polytree(self):
         "Test check_recursion on polytree"
@@ -3,7 +3,9 @@
 # this repository contains the full copyright notices and license terms.
 import datetime
 from itertools import combinations
+from unittest.mock import patch
 
+from trytond.ir import trigger as trigger_module
 from trytond.ir.exceptions import TriggerConditionError
 from trytond.model.exceptions import SQLConstraintError
 from trytond.pool import Pool
@@ -479,3 +481,77 @@ class TriggerTestCase(TestCase):
 
         # Restart the cache on the get_triggers method of ir.trigger
         Trigger._get_triggers_cache.clear()
+
+    @with_transaction()
+    def test_condition_domain(self):
+        "Test condition domain"
+        pool = Pool()
+        Trigger = pool.get('ir.trigger')
+        Triggered = pool.get('test.triggered')
+        encoder = PYSONEncoder()
+        name = Eval('self', {}).get('name')
+
+        for condition, domain in [
+                ('true', []),
+                (name == 'Bar', [('name', '=', 'Bar')]),
+                (name.in_(['Foo', 'Bar']), [('name', 'in', ['Foo', 'Bar'])]),
+                (name != 'Bar',
+                    ['OR', [('name', '!=', 'Bar')], ('name', '=', None)]),
+                (Eval('self', {}).get('name', None) != None,  # noqa: E711
+                    [('name', '!=', None)]),
+                ((name == 'Foo') | (name == 'Bar'),
+                    ['OR', [('name', '=', 'Foo')], [('name', '=', 'Bar')]]),
+                (Eval('self', {}).get('id', 0) == 1, [('id', '=', 1)]),
+                (Eval('self', {}).get('name', 0) == 1, None),
+                (name.in_(['Foo', 1]), None),
+                (Eval('self', {}).get('id', 0.0) == 1.5, None),
+                (Eval('self', {}).get('id', False) == True,  # noqa: E712
+                    None),
+                (name == Eval('context', {}).get('name'), None),
+                (Eval('context', {}).get('name') == 'Bar', None),
+                ]:
+            if not isinstance(condition, str):
+                condition = encoder.encode(condition)
+            trigger = Trigger(condition=condition)
+            with self.subTest(condition=condition):
+                self.assertEqual(trigger.condition_domain(Triggered), domain)
+
+    @with_transaction()
+    def test_condition_domain_cached(self):
+        "Test condition domain is cached"
+        pool = Pool()
+        Trigger = pool.get('ir.trigger')
+        Triggered = pool.get('test.triggered')
+        condition = PYSONEncoder().encode(
+            Eval('self', {}).get('name') == "Cached")
+
+        with patch.object(trigger_module, '_condition_domain',
+                wraps=trigger_module._condition_domain) as condition_domain:
+            for _ in range(2):
+                trigger = Trigger(condition=condition)
+                self.assertEqual(
+                    trigger.condition_domain(Triggered),
+                    [('name', '=', "Cached")])
+
+        self.assertEqual(condition_domain.call_count, 1)
+
+    @with_transaction()
+    def test_filter(self):
+        "Test filter records"
+        pool = Pool()
+        Trigger = pool.get('ir.trigger')
+        Triggered = pool.get('test.triggered')
+        name = Eval('self', {}).get('name')
+
+        records = Triggered.create([
+                {'name': 'Foo'}, {'name': 'Bar'}, {'name': None}])
+        for condition, result in [
+                (name == 'Bar', records[1:2]),
+                (name != 'Bar', records[0:1] + records[2:]),
+                (name.in_(['Foo', None]), records[0:1] + records[2:]),
+                (name == Eval('context', {}).get('name', 'Foo'),
+                    records[0:1]),
+                ]:
+            trigger = Trigger(condition=PYSONEncoder().encode(condition))
+            with self.subTest(condition=condition):
+                self.assertEqual(trigger.filter(records), result)
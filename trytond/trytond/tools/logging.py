@@ -1,3 +1,5 @@
+import sys
+import traceback
 from collections.abc import Iterable, Mapping
 from itertools import islice
 
@@ -124,3 +126,12 @@ class format_args:
 
         s += ')'
         return s
+
+
+def format_exception(exception):
+    "Return the traceback of the exception without the system paths"
+    tb_s = ''.join(traceback.format_exception(
+            type(exception), exception, exception.__traceback__))
+    for path in sys.path:
+        tb_s = tb_s.replace(path, '')
+    return tb_s
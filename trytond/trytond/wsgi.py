@@ -5,8 +5,6 @@ import http.client
 import logging
 import os
 import posixpath
-import sys
-import traceback
 import urllib.parse
 from functools import wraps
 
@@ -34,6 +32,7 @@ from trytond.protocols.wrappers import (
 from trytond.protocols.xmlrpc import XMLProtocol
 from trytond.status import processing
 from trytond.tools import resolve, safe_join
+from trytond.tools.logging import format_exception
 
 __all__ = ['TrytondWSGI', 'app']
 
@@ -105,10 +104,7 @@ class TrytondWSGI(object):
         except Exception as e:
             logger.debug(
                 "Exception when processing %s", request, exc_info=True)
-            tb_s = ''.join(traceback.format_exception(*sys.exc_info()))
-            for path in sys.path:
-                tb_s = tb_s.replace(path, '')
-            e.__format_traceback__ = tb_s
+            e.__format_traceback__ = format_exception(e)
             response = e
             for error_handler in self.error_handlers:
                 rv = error_handler(self, request, e)
@@ -177,7 +173,7 @@ class TrytondWSGI(object):
 
         if origin and isinstance(response, Response):
             response.headers['Access-Control-Allow-Origin'] = origin
-            response.headers['Vary'] = 'Origin'
+            response.vary.add('Origin')
             method = request.headers.get('Access-Control-Request-Method')
             if method:
                 response.headers['Access-Control-Allow-Methods'] = method